@@ -0,0 +1,230 @@
+"""
+Content-addressed cache for analyzer results.
+
+Keys are a SHA-256 of the normalized feedback text plus the analyzer backend,
+its model/lexicon version and any options that change the output, so a model
+or lexicon change naturally misses the old entries. Entries live in a bounded
+in-process LRU with a TTL and, optionally, in a SQLite file that survives
+restarts. Batches are read and written with one query/transaction per batch,
+expired rows are pruned from the file, and SQLite I/O never happens under the
+memory tier's lock.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace so trivially different texts share a key"""
+    return _WHITESPACE_RE.sub(' ', text).strip().lower()
+
+
+class AnalysisCache:
+    """Two-tier (memory LRU + optional SQLite) cache of analysis results"""
+
+    PRUNE_EVERY = 1000  # persisted entries between deletions of expired rows
+    KEYS_PER_QUERY = 500  # stays under SQLite's bound-parameter limit
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600, db_path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()  # memory tier only; SQLite I/O happens outside it
+        self._local = threading.local()
+        self._writes_since_prune = 0
+        self._stats = {
+            'hits': 0,
+            'persistent_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+            'pruned': 0
+        }
+        if db_path:
+            self.prune()
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache from ANALYSIS_CACHE_* environment variables"""
+        return cls(
+            max_entries=int(os.getenv('ANALYSIS_CACHE_SIZE', 10000)),
+            ttl_seconds=float(os.getenv('ANALYSIS_CACHE_TTL', 3600)),
+            db_path=os.getenv('ANALYSIS_CACHE_DB') or None
+        )
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(text: str, backend: str, model_version: str, **options) -> str:
+        """Hash the normalized text together with everything that affects the result"""
+        material = json.dumps(
+            [normalize_text(text), backend, model_version, sorted(options.items())]
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _connection(self):
+        # One connection per thread (reopened after a fork), so persistent
+        # lookups from different request threads do not queue on each other
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.db_path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_analysis_cache_expires_at ON analysis_cache (expires_at)"
+            )
+            connection.commit()
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result or None; expired entries count as misses"""
+        return self.get_many([key])[key]
+
+    def get_many(self, keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Look up several keys; memory misses are fetched from SQLite in a few queries"""
+        found = dict.fromkeys(keys)
+        if not self.enabled:
+            return found
+        now = time.time()
+        missing = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    expires_at, result = entry
+                    if expires_at > now:
+                        self._entries.move_to_end(key)
+                        self._stats['hits'] += 1
+                        found[key] = dict(result)
+                        continue
+                    del self._entries[key]
+                    self._stats['expirations'] += 1
+                missing.append(key)
+
+        persisted = {}
+        if missing and self.db_path:
+            unique = list(dict.fromkeys(missing))
+            try:
+                connection = self._connection()
+                for start in range(0, len(unique), self.KEYS_PER_QUERY):
+                    chunk = unique[start:start + self.KEYS_PER_QUERY]
+                    rows = connection.execute(
+                        "SELECT cache_key, result, expires_at FROM analysis_cache "
+                        f"WHERE cache_key IN ({', '.join('?' * len(chunk))}) AND expires_at > ?",
+                        chunk + [now]
+                    ).fetchall()
+                    persisted.update((row[0], (row[2], json.loads(row[1]))) for row in rows)
+            except sqlite3.Error as e:
+                print(f"Error reading analysis cache: {e}")
+
+        with self._lock:
+            for key in missing:
+                entry = persisted.get(key)
+                if entry is None:
+                    self._stats['misses'] += 1
+                    continue
+                self._store(key, *entry)
+                self._stats['persistent_hits'] += 1
+                found[key] = dict(entry[1])
+        return found
+
+    def set(self, key: str, result: Dict[str, Any]):
+        """Cache a successful result; results carrying an 'error' are skipped"""
+        self.set_many([(key, result)])
+
+    def set_many(self, items: List[Tuple[str, Dict[str, Any]]]):
+        """Cache several (key, result) pairs; persisted in one transaction"""
+        if not self.enabled:
+            return
+        items = [(key, result) for key, result in items if 'error' not in result]
+        if not items:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            for key, result in items:
+                self._store(key, expires_at, dict(result))
+            self._writes_since_prune += len(items)
+            prune = self.db_path and self._writes_since_prune >= self.PRUNE_EVERY
+            if prune:
+                self._writes_since_prune = 0
+        if not self.db_path:
+            return
+        try:
+            connection = self._connection()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO analysis_cache (cache_key, result, expires_at) VALUES (?, ?, ?)",
+                    [(key, json.dumps(result), expires_at) for key, result in items]
+                )
+        except sqlite3.Error as e:
+            print(f"Error writing analysis cache: {e}")
+        if prune:
+            self.prune()
+
+    def prune(self):
+        """Delete expired rows from the SQLite tier; returns how many were removed"""
+        if not self.db_path:
+            return 0
+        try:
+            connection = self._connection()
+            with connection:
+                deleted = connection.execute(
+                    "DELETE FROM analysis_cache WHERE expires_at <= ?", (time.time(),)
+                ).rowcount
+        except sqlite3.Error as e:
+            print(f"Error pruning analysis cache: {e}")
+            return 0
+        with self._lock:
+            self._stats['pruned'] += deleted
+        return deleted
+
+    def _store(self, key, expires_at, result):
+        """Insert into the memory tier and evict least-recently-used entries (lock held)"""
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def invalidate(self):
+        """Drop every cached result, e.g. after a model or lexicon change"""
+        with self._lock:
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+        if self.db_path:
+            connection = self._connection()
+            with connection:
+                connection.execute("DELETE FROM analysis_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus current size and hit ratio"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['persistent_hits'] + stats['misses']
+        stats['max_entries'] = self.max_entries
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['persistent'] = bool(self.db_path)
+        stats['hit_ratio'] = round((stats['hits'] + stats['persistent_hits']) / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,101 @@
+"""
+Streaming export of stored analyses as CSV or NDJSON.
+
+Rows are read from the database in fetchmany() chunks and encoded chunk by
+chunk, so memory use does not depend on how many rows are exported.
+"""
+import csv
+import io
+import json
+import zlib
+
+from database_sqlite import get_db_connection
+
+EXPORT_COLUMNS = ['id', 'user_id', 'email', 'feedback_text', 'sentiment', 'confidence', 'tier', 'created_at']
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+FETCH_SIZE = 1000
+
+
+def build_export_query(user_id=None, sentiment=None, date_from=None, date_to=None):
+    """SQL and parameters for the filtered, created_at-ordered export"""
+    clauses = []
+    params = []
+    if user_id is not None:
+        clauses.append("ua.user_id = ?")
+        params.append(user_id)
+    if sentiment:
+        clauses.append("ua.sentiment = ?")
+        params.append(sentiment)
+    if date_from:
+        clauses.append("ua.created_at >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append("ua.created_at < ?")
+        params.append(date_to)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = f"""
+        SELECT ua.id, ua.user_id, u.email, ua.feedback_text, ua.sentiment,
+               ua.confidence, ua.tier, ua.created_at
+        FROM user_analyses ua
+        LEFT JOIN users u ON ua.user_id = u.id
+        {where}
+        ORDER BY ua.created_at, ua.id
+    """
+    return sql, params
+
+
+def iter_row_chunks(sql, params, fetch_size=FETCH_SIZE):
+    """Yield lists of rows from a cursor; the connection is held only while iterating"""
+    connection = get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        connection.close()
+
+
+def encode_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows(tuple(row) for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def encode_ndjson(chunks):
+    for rows in chunks:
+        yield ''.join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + '\n' for row in rows
+        )
+
+
+def gzip_stream(pieces):
+    """Gzip a stream of text pieces on the fly"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for piece in pieces:
+        data = compressor.compress(piece.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(fmt, sql, params, compress=False):
+    """Encoded (and optionally gzipped) export body as a generator"""
+    encoder = encode_csv if fmt == 'csv' else encode_ndjson
+    pieces = encoder(iter_row_chunks(sql, params))
+    if compress:
+        return gzip_stream(pieces)
+    return (piece.encode('utf-8') for piece in pieces)
@@ -0,0 +1,170 @@
+"""
+Write-behind persistence for analysis records.
+
+Request threads enqueue rows and return immediately; a single writer thread
+drains the queue and inserts rows with one executemany/commit per flush,
+either every `flush_rows` rows or every `flush_interval_ms`, whichever comes
+first. The queue is bounded: when it is full, enqueue() waits up to
+`put_timeout` seconds and then reports failure so the caller can fall back to
+a synchronous write.
+
+Queued rows have already been acknowledged, so a failed flush is not simply
+dropped: transient errors (e.g. "database is locked") are retried with
+exponential backoff, and a batch that fails for any other reason is split in
+halves until only the rows that genuinely cannot be written are given up.
+"""
+import queue
+import sqlite3
+import threading
+import time
+
+from database_sqlite import save_analyses
+
+_WAKE_UP = object()  # queued by stop() so the writer notices without waiting a full interval
+
+
+class AnalysisWriter:
+    """Single background thread that batches user_analyses inserts"""
+
+    def __init__(self, max_queue=10000, flush_rows=500, flush_interval_ms=200,
+                 put_timeout=0.05, save=save_analyses, max_retries=5, retry_backoff_ms=50):
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff_ms / 1000
+        self._save = save
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'rejected': 0,
+            'flushes': 0,
+            'rows_written': 0,
+            'rows_failed': 0,
+            'retries': 0,
+            'flush_ms_total': 0.0,
+            'flush_ms_max': 0.0
+        }
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='analysis-writer', daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=10):
+        """Stop the writer after flushing everything already queued"""
+        self._stop.set()
+        try:
+            self._queue.put_nowait(_WAKE_UP)  # don't wait out a long flush interval
+        except queue.Full:
+            pass  # a full queue wakes the writer anyway
+        if self._thread is not None:
+            self._thread.join(timeout)
+        # Rows that raced in after the writer exited
+        leftovers = []
+        while True:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is not _WAKE_UP:
+                leftovers.append(row)
+        if leftovers:
+            self._write(leftovers)
+
+    def enqueue(self, rows):
+        """
+        Queue rows for writing. Returns False (nothing queued) when the queue
+        stays full for put_timeout seconds or the writer is stopped.
+        """
+        if self._stop.is_set() or self._thread is None:
+            return False
+        deadline = time.monotonic() + self.put_timeout
+        for index, row in enumerate(rows):
+            try:
+                self._queue.put(row, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                with self._lock:
+                    self._stats['enqueued'] += index
+                    self._stats['rejected'] += len(rows) - index
+                if index:
+                    # Part of the request is already queued; write the rest ourselves
+                    self._write(list(rows[index:]))
+                    return True
+                return False
+        with self._lock:
+            self._stats['enqueued'] += len(rows)
+        return True
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.flush_rows and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            batch = [row for row in batch if row is not _WAKE_UP]
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        written = self._save_batch(batch)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats['flushes'] += 1
+            self._stats['rows_written'] += written
+            self._stats['rows_failed'] += len(batch) - written
+            self._stats['flush_ms_total'] += elapsed_ms
+            self._stats['flush_ms_max'] = max(self._stats['flush_ms_max'], elapsed_ms)
+
+    def _save_batch(self, batch):
+        """Save a batch, retrying transient errors; returns the number of rows written"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._save(batch)
+                return len(batch)
+            except sqlite3.OperationalError as e:
+                # Locked/busy database: wait and try the same batch again
+                error = e
+                if attempt == self.max_retries:
+                    break
+                with self._lock:
+                    self._stats['retries'] += 1
+                time.sleep(self.retry_backoff * 2 ** attempt)
+            except Exception as e:
+                # Not transient (e.g. one row violates a constraint): isolate the bad rows
+                if len(batch) == 1:
+                    error = e
+                    break
+                middle = len(batch) // 2
+                return self._save_batch(batch[:middle]) + self._save_batch(batch[middle:])
+        print(f"Error flushing {len(batch)} analyses after {attempt + 1} attempts: {error}")
+        return 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        flushes = stats['flushes']
+        stats['queue_depth'] = self._queue.qsize()
+        stats['queue_capacity'] = self._queue.maxsize
+        stats['running'] = self._thread is not None and self._thread.is_alive()
+        stats['flush_ms_avg'] = round(stats['flush_ms_total'] / flushes, 3) if flushes else 0.0
+        stats['flush_ms_total'] = round(stats['flush_ms_total'], 3)
+        stats['flush_ms_max'] = round(stats['flush_ms_max'], 3)
+        return stats
@@ -1,16 +1,74 @@
-from flask import Flask, request, jsonify
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Blueprint, Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
 import os
+import atexit
+import importlib
+import math
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-# Use mock LLM instead of OpenAI for now
-from llm_mock import analyze_feedback
+from html import escape
+from urllib.parse import urlencode
+from analysis_cache import AnalysisCache
 from auth import (
-    register_user, authenticate_user, generate_token, verify_token,
-    get_user_by_id, create_or_update_oauth_user
+    register_user, authenticate_user, issue_token, revoke_token, revoke_all_tokens,
+    create_or_update_oauth_user, get_user_from_token,
+    get_auth_cache_stats, AuthBusyError
+)
+from session_store import session_store
+from rate_limit import limiter_from_env
+from database_sqlite import (
+    init_db, get_db_connection, get_connection_stats, save_analyses, get_counts,
+    get_sentiment_rollups, to_db_timestamp, ROLLUP_GRANULARITIES
+)
+from analysis_writer import AnalysisWriter
+from google_oauth import GOOGLE_CLIENT_ID, get_google_cache_stats, verify_google_id_token
+from pagination import (
+    InvalidCursor, build_page_query, clamp_page_size, decode_cursor, encode_cursor,
+    fetch_page
 )
-from database_sqlite import init_db, get_db_connection
+from analysis_export import EXPORT_FORMATS, build_export_query, stream_export
+import metrics
+
+api = Blueprint('api', __name__)
+
+# Upper bound on items accepted by /api/analyze/batch in a single request
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 5000))
+
+# Analyzer backend: llm_mock (keyword lexicon, default), llm_sklearn (local
+# scikit-learn model), llm (OpenAI) or llm_cascade (local first, LLM when
+# uncertain). All expose the same analyze_feedback API. The module is
+# imported on first use (or during warm-up), not when this file is imported.
+ANALYZER_BACKENDS = ('llm_mock', 'llm_sklearn', 'llm', 'llm_cascade')
+ANALYZER_BACKEND = os.environ.get('ANALYZER_BACKEND', 'llm_mock')
+if ANALYZER_BACKEND not in ANALYZER_BACKENDS:
+    raise ValueError(f"ANALYZER_BACKEND must be one of {', '.join(ANALYZER_BACKENDS)}")
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+# Run warm_up() inside create_app() so a worker is ready before it serves
+APP_WARM_UP = os.environ.get('APP_WARM_UP', 'true').lower() in ('1', 'true', 'yes')
+
+# Background sync of revoked sessions and sweeping of expired ones
+SESSION_SWEEPER = os.environ.get('SESSION_SWEEPER', 'true').lower() in ('1', 'true', 'yes')
+
+# Comma-separated emails allowed to list every user (GET /api/users)
+ADMIN_EMAILS = {
+    email.strip().lower() for email in os.environ.get('ADMIN_EMAILS', '').split(',') if email.strip()
+}
+
+# Optional write-behind mode: analyses are queued and flushed in batches
+WRITE_BEHIND = os.environ.get('ANALYSIS_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+
+# Built by create_app(); one app per process
+analysis_cache = None
+analysis_writer = None
+analyze_limiter = None
+batch_limiter = None
 
-app = Flask(__name__)
 allowed_origins = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
@@ -18,13 +76,125 @@ allowed_origins = [
     "https://feedbackanalyzer-6r6g4finv-yashmeen-kaurs-projects.vercel.app",
     "https://feedbackanalyzer.vercel.app",
 ]
-CORS(
-    app,
-    supports_credentials=True,
-    resources={r"/*": {"origins": allowed_origins}},
-    allow_headers=["Content-Type", "Authorization"],
-    expose_headers=["Content-Type", "Authorization"],
-)
+
+# Seconds spent in each startup phase, reported at /api/startup
+startup_report = {'phases': {}, 'import_seconds': None, 'ready_seconds': None}
+
+@contextmanager
+def startup_phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_report['phases'][name] = round(time.perf_counter() - started, 4)
+
+def get_analyzer():
+    """The configured analyzer module, imported on first use"""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                with startup_phase('import_analyzer'):
+                    _analyzer = importlib.import_module(ANALYZER_BACKEND)
+    return _analyzer
+
+def warm_up():
+    """Open a database connection and build the analyzer before taking traffic"""
+    with startup_phase('database'):
+        get_db_connection().close()
+    backend_warm_up = getattr(get_analyzer(), 'warm_up', None)
+    if backend_warm_up:
+        with startup_phase('warm_up_analyzer'):
+            backend_warm_up()
+
+def create_app(warm=None):
+    """
+    Build the Flask app. Pending schema migrations are applied first, so every
+    entry point (`python app.py`, gunicorn 'app:create_app()', `app:app`) runs
+    on the current schema. The analyzer is constructed lazily; with warm=True
+    (default: APP_WARM_UP) it is built here so the first request does not pay
+    for it. Phase timings are printed and served at /api/startup.
+    """
+    global analysis_cache, analysis_writer, analyze_limiter, batch_limiter
+    started = time.perf_counter()
+    startup_report['phases'].clear()
+
+    with startup_phase('flask'):
+        app = Flask(__name__)
+        CORS(
+            app,
+            supports_credentials=True,
+            resources={r"/*": {"origins": allowed_origins}},
+            allow_headers=["Content-Type", "Authorization"],
+            expose_headers=["Content-Type", "Authorization"],
+        )
+        app.before_request(start_request_timer)
+        app.after_request(record_request_metrics)
+        app.teardown_request(record_request_exception)
+        app.register_blueprint(api)
+
+    with startup_phase('migrations'):
+        init_db()
+
+    with startup_phase('analysis_cache'):
+        # Results are cached per (normalized text, backend, lexicon/model version)
+        analysis_cache = AnalysisCache.from_env()
+
+    with startup_phase('rate_limits'):
+        # Per user (or client IP): requests/second for /api/analyze, items/second for batches
+        analyze_limiter = limiter_from_env('analyze', rate=5, burst=60)
+        batch_limiter = limiter_from_env('batch', rate=100, burst=MAX_BATCH_SIZE)
+
+    if WRITE_BEHIND and analysis_writer is None:
+        with startup_phase('write_behind'):
+            analysis_writer = AnalysisWriter(
+                max_queue=int(os.environ.get('WRITE_BEHIND_QUEUE_SIZE', 10000)),
+                flush_rows=int(os.environ.get('WRITE_BEHIND_FLUSH_ROWS', 500)),
+                flush_interval_ms=int(os.environ.get('WRITE_BEHIND_FLUSH_MS', 200))
+            ).start()
+            atexit.register(analysis_writer.stop)
+
+    if SESSION_SWEEPER:
+        with startup_phase('sessions'):
+            session_store.start()
+            atexit.register(session_store.stop)
+
+    if APP_WARM_UP if warm is None else warm:
+        warm_up()
+
+    startup_report['ready_seconds'] = round(time.perf_counter() - started, 4)
+    phases = ', '.join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in startup_report['phases'].items())
+    print(f"Startup: imports {startup_report['import_seconds'] * 1000:.1f}ms, "
+          f"create_app {startup_report['ready_seconds'] * 1000:.1f}ms ({phases})")
+    return app
+
+def __getattr__(name):
+    # `app:app` (gunicorn, flask run) keeps working: build the default app on first access
+    global app
+    if name == 'app':
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    metrics.set_route(request.url_rule.rule if request.url_rule else 'unmatched')
+
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        route = metrics.current_route()
+        metrics.observe('feedback_request_duration_seconds', time.perf_counter() - started, route=route)
+        metrics.increment('feedback_requests_total', route=route, method=request.method,
+                          status=response.status_code)
+        if response.status_code >= 500:
+            metrics.increment('feedback_request_errors_total', route=route)
+    return response
+
+def record_request_exception(error=None):
+    # Unhandled exceptions skip after_request, so count them here
+    if error is not None:
+        metrics.increment('feedback_request_errors_total', route=metrics.current_route())
 
 # Initialize database on startup
 def create_tables():
@@ -33,24 +203,122 @@ def create_tables():
     except Exception as e:
         print(f"Warning: Could not initialize database: {e}")
 
+def parse_bool(value, default):
+    """JSON boolean, or 'true'/'false'/'1'/'0'/'yes'/'no'; ValueError for anything else"""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in ('true', '1', 'yes', 'false', '0', 'no'):
+        return value.strip().lower() in ('true', '1', 'yes')
+    raise ValueError(f"expected a boolean, got {value!r}")
+
+def get_bearer_token():
+    """Token from an 'Authorization: Bearer <token>' header, or None"""
+    parts = request.headers.get('Authorization', '').split(' ')
+    return parts[1] if len(parts) == 2 and parts[1] else None
+
 # Helper function to get current user from token
 def get_current_user():
     """Extract user from Authorization header"""
-    auth_header = request.headers.get('Authorization')
-    if not auth_header:
+    token = get_bearer_token()
+    if not token:
         return None
     
     try:
-        token = auth_header.split(' ')[1]  # Bearer <token>
-        payload = verify_token(token)
-        if payload:
-            return get_user_by_id(payload['user_id'])
-        return None
+        with metrics.stage('auth'):
+            return get_user_from_token(token)
     except:
         return None
 
+def is_admin(user):
+    return bool(user) and (user.get('email') or '').lower() in ADMIN_EMAILS
+
+def own_user_id(user):
+    """
+    (user id, None) for the caller, or (None, 403 response) when a `user_id`
+    query parameter names somebody else
+    """
+    user_id = request.args.get('user_id', type=int)
+    if user_id is not None and user_id != user['id']:
+        return None, (jsonify({'error': "Cannot access another user's data"}), 403)
+    return user['id'], None
+
+def rate_limited(limiter, user, cost=1):
+    """A 429 response when the caller's bucket is empty, otherwise None"""
+    if limiter is None:
+        return None
+    key = f"user:{user['id']}" if user else f"ip:{request.remote_addr}"
+    wait = limiter.acquire(key, cost)
+    if not wait:
+        return None
+    retry_after = max(1, math.ceil(wait))
+    return jsonify({
+        'error': 'Rate limit exceeded',
+        'retry_after': retry_after
+    }), 429, {'Retry-After': str(retry_after)}
+
+def analysis_cache_key(text, generate_reply):
+    """Cache key for a text under the current analyzer backend and version"""
+    return analysis_cache.make_key(
+        text, ANALYZER_BACKEND, get_analyzer().get_model_version(), generate_reply=generate_reply
+    )
+
+def run_analysis(text, generate_reply=True):
+    """Analyze one text, answering from the cache when possible"""
+    key = analysis_cache_key(text, generate_reply)
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        cached['feedback'] = text
+        return cached
+    with metrics.stage('analyzer'):
+        result = get_analyzer().analyze_feedback(text, generate_reply=generate_reply)
+    analysis_cache.set(key, result)
+    return result
+
+def run_analysis_batch(texts, generate_reply=True):
+    """Analyze many texts in input order; only cache misses reach the analyzer"""
+    results = [None] * len(texts)
+    keys = [analysis_cache_key(text, generate_reply) for text in texts]
+    cached = analysis_cache.get_many(keys)
+    missing = []
+    for index, (text, key) in enumerate(zip(texts, keys)):
+        if cached[key] is not None:
+            # Texts that normalize alike share a key, so copy per item
+            results[index] = dict(cached[key], feedback=text)
+        else:
+            missing.append(index)
+    
+    if missing:
+        with metrics.stage('analyzer'):
+            analyzed = get_analyzer().analyze_feedback_batch(
+                [texts[i] for i in missing], generate_reply=generate_reply
+            )
+        for index, result in zip(missing, analyzed):
+            results[index] = result
+        analysis_cache.set_many([(keys[index], result) for index, result in zip(missing, analyzed)])
+    return results
+
+def persist_analyses(user_id, results):
+    """Save successful results for a user; returns the number of rows accepted"""
+    created_at = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    rows = [
+        (user_id, result['feedback'], result['sentiment'], result.get('confidence'),
+         created_at, result.get('tier', ANALYZER_BACKEND))
+        for result in results if 'error' not in result
+    ]
+    if not rows:
+        return 0
+    # Fall back to a synchronous write when the write-behind queue is full
+    with metrics.stage('db_write'):
+        if analysis_writer is not None and analysis_writer.enqueue(rows):
+            return len(rows)
+        return save_analyses(rows)
+
 # Authentication Routes
-@app.route('/api/auth/register', methods=['POST'])
+@api.route('/api/auth/register', methods=['POST'])
 def register():
     try:
         data = request.get_json()
@@ -65,7 +333,7 @@ def register():
         if error:
             return jsonify({'error': error}), 400
         
-        token = generate_token(user['id'], user['email'])
+        token = issue_token(user['id'], user['email'])
         return jsonify({
             'message': 'User registered successfully',
             'token': token,
@@ -76,10 +344,12 @@ def register():
                 'provider': user['provider']
             }
         }), 201
+    except AuthBusyError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/auth/login', methods=['POST'])
+@api.route('/api/auth/login', methods=['POST'])
 def login():
     try:
         data = request.get_json()
@@ -93,7 +363,7 @@ def login():
         if error:
             return jsonify({'error': error}), 401
         
-        token = generate_token(user['id'], user['email'])
+        token = issue_token(user['id'], user['email'])
         return jsonify({
             'message': 'Login successful',
             'token': token,
@@ -105,10 +375,29 @@ def login():
                 'avatar_url': user.get('avatar_url')
             }
         }), 200
+    except AuthBusyError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/auth/me', methods=['GET'])
+@api.route('/api/auth/logout', methods=['POST'])
+def logout():
+    """Revoke the presented token"""
+    token = get_bearer_token()
+    if not token or not revoke_token(token):
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify({'message': 'Logged out'}), 200
+
+@api.route('/api/auth/logout-all', methods=['POST'])
+def logout_all():
+    """Revoke every session of the current user ("log out everywhere")"""
+    token = get_bearer_token()
+    revoked = revoke_all_tokens(token) if token else None
+    if revoked is None:
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify({'message': 'Logged out everywhere', 'sessions_revoked': revoked}), 200
+
+@api.route('/api/auth/me', methods=['GET'])
 def get_current_user_info():
     """Get current authenticated user info"""
     user = get_current_user()
@@ -123,7 +412,7 @@ def get_current_user_info():
         'avatar_url': user.get('avatar_url')
     }), 200
 
-@app.route('/api/auth/oauth/google', methods=['POST'])
+@api.route('/api/auth/oauth/google', methods=['POST'])
 def oauth_google():
     """Handle Google OAuth callback"""
     try:
@@ -133,21 +422,12 @@ def oauth_google():
         if not id_token_str:
             return jsonify({'error': 'Google token is required'}), 400
         
-        # Verify Google ID token and get user info
-        from google.oauth2 import id_token
-        from google.auth.transport import requests
-        
-        google_client_id = os.getenv(
-            'GOOGLE_CLIENT_ID',
-            '1058789935119-ir2vemi3kdutvsu9mgsar8i2qccsqooi.apps.googleusercontent.com'
-        )
-        if not google_client_id:
+        if not GOOGLE_CLIENT_ID:
             return jsonify({'error': 'Google OAuth not configured'}), 500
         
         try:
-            idinfo = id_token.verify_oauth2_token(
-                id_token_str, requests.Request(), google_client_id
-            )
+            # Verify Google ID token (cached certificates and verified tokens) and get user info
+            idinfo = verify_google_id_token(id_token_str, GOOGLE_CLIENT_ID)
             
             email = idinfo.get('email')
             name = idinfo.get('name')
@@ -165,7 +445,7 @@ def oauth_google():
             if not user:
                 return jsonify({'error': 'Failed to create user'}), 500
             
-            token = generate_token(user['id'], user['email'])
+            token = issue_token(user['id'], user['email'])
             return jsonify({
                 'message': 'OAuth login successful',
                 'token': token,
@@ -185,75 +465,349 @@ def oauth_google():
         return jsonify({'error': str(e)}), 500
 
 # Analyze route with API prefix for consistency
-@app.route('/api/analyze', methods=['POST'])
+@api.route('/api/analyze', methods=['POST'])
 def analyze():
+    user = get_current_user()
+    limited = rate_limited(analyze_limiter, user)
+    if limited:
+        return limited
+    
     data = request.get_json()
     user_input = data.get('feedback') or data.get('text')  # Accept both 'feedback' and 'text'
     if not user_input:
         return jsonify({'error': 'No feedback text provided'}), 400
     
-    result = analyze_feedback(user_input)
+    # Callers that only need sentiment can skip the (expensive) reply generation
+    try:
+        generate_reply = parse_bool(data.get('generate_reply'), True)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid generate_reply: {e}'}), 400
+    result = run_analysis(user_input, generate_reply=generate_reply)
     
     # Optionally save to database if user is authenticated
-    user = get_current_user()
     if user:
         try:
-            connection = get_db_connection()
-            cursor = connection.cursor()
-            cursor.execute("""
-                INSERT INTO user_analyses (user_id, feedback_text, sentiment, confidence)
-                VALUES (?, ?, ?, ?)
-            """, (user['id'], result['feedback'], result['sentiment'], result.get('confidence')))
-            connection.commit()
-            connection.close()
+            persist_analyses(user['id'], [result])
         except Exception as e:
             print(f"Error saving analysis: {e}")
     
-    return jsonify(result)
+    with metrics.stage('serialization'):
+        return jsonify(result)
+
+@api.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Analyze a list of feedback texts and save them in one transaction"""
+    data = request.get_json(silent=True) or {}
+    items = data.get('feedbacks') or data.get('texts')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'A non-empty list of feedback texts is required'}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Batch too large (max {MAX_BATCH_SIZE} items)'}), 413
+    
+    # Each item costs one token of the batch bucket
+    user = get_current_user()
+    limited = rate_limited(batch_limiter, user, cost=len(items))
+    if limited:
+        return limited
+    
+    try:
+        generate_reply = parse_bool(data.get('generate_reply'), True)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid generate_reply: {e}'}), 400
+    
+    results = [None] * len(items)
+    valid_indexes = []
+    for index, item in enumerate(items):
+        if isinstance(item, str) and item.strip():
+            valid_indexes.append(index)
+        else:
+            results[index] = {'feedback': item, 'error': 'No feedback text provided'}
+    
+    if valid_indexes:
+        analyzed = run_analysis_batch(
+            [items[i] for i in valid_indexes], generate_reply=generate_reply
+        )
+        for index, result in zip(valid_indexes, analyzed):
+            results[index] = result
+    
+    # Save every successful item with a single executemany/commit
+    saved = 0
+    if user:
+        try:
+            saved = persist_analyses(user['id'], results)
+        except Exception as e:
+            print(f"Error saving batch analyses: {e}")
+    
+    failed = sum(1 for result in results if 'error' in result)
+    with metrics.stage('serialization'):
+        return jsonify({
+            'results': results,
+            'total': len(results),
+            'succeeded': len(results) - failed,
+            'failed': failed,
+            'saved': saved
+        })
+
+@api.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Analysis cache counters (hits, misses, evictions, size)"""
+    stats = analysis_cache.stats()
+    stats['backend'] = ANALYZER_BACKEND
+    stats['model_version'] = get_analyzer().get_model_version()
+    return jsonify(stats)
+
+@api.route('/api/analyzer/stats', methods=['GET'])
+def analyzer_stats():
+    """Active analyzer backend, its version and backend-specific counters"""
+    get_stats = getattr(get_analyzer(), 'get_stats', None)
+    return jsonify({
+        'backend': ANALYZER_BACKEND,
+        'model_version': get_analyzer().get_model_version(),
+        'stats': get_stats() if get_stats else None
+    })
+
+@api.route('/api/cache/invalidate', methods=['POST'])
+def cache_invalidate():
+    """Clear the analysis cache, optionally reloading the lexicon/model first"""
+    if not get_current_user():
+        return jsonify({'error': 'Unauthorized'}), 401
+    data = request.get_json(silent=True) or {}
+    try:
+        if data.get('reload_model') or data.get('reload_lexicon'):
+            reload_model = getattr(get_analyzer(), 'reload_model', None)
+            if reload_model:
+                reload_model()
+        analysis_cache.invalidate()
+        return jsonify({
+            'message': 'Analysis cache invalidated',
+            'model_version': get_analyzer().get_model_version()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/startup', methods=['GET'])
+def startup_stats():
+    """Import and create_app() phase timings for this worker"""
+    return jsonify(dict(startup_report, backend=ANALYZER_BACKEND, analyzer_loaded=_analyzer is not None))
+
+@api.route('/api/rate-limit/stats', methods=['GET'])
+def rate_limit_stats():
+    """Allowed/limited counts and bucket usage of the analysis rate limiters"""
+    return jsonify({
+        'analyze': analyze_limiter.stats() if analyze_limiter else None,
+        'batch': batch_limiter.stats() if batch_limiter else None
+    })
+
+@api.route('/api/auth/cache/stats', methods=['GET'])
+def auth_cache_stats():
+    """Token/user cache hit ratios, lookup latency and Google OAuth caches"""
+    stats = get_auth_cache_stats()
+    stats['google'] = get_google_cache_stats()
+    return jsonify(stats)
+
+@api.route('/api/db/stats', methods=['GET'])
+def db_stats():
+    """SQLite connection pool reuse and wait-time counters"""
+    stats = get_connection_stats()
+    stats['write_behind'] = analysis_writer.stats() if analysis_writer else None
+    return jsonify(stats)
+
+@api.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request and stage latency histograms in Prometheus text format"""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+def parse_date_param(name):
+    """Validate an ISO date/datetime query parameter and return it in DB format (UTC)"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    return to_db_timestamp(value)
+
+@api.route('/api/stats', methods=['GET'])
+def sentiment_stats():
+    """
+    Sentiment distribution over time from the hourly/daily rollups. The global
+    view is public; per-user stats (user_id=...) are only served to that user.
+    """
+    granularity = request.args.get('granularity', 'day').lower()
+    if granularity not in ROLLUP_GRANULARITIES:
+        return jsonify({'error': f"Unsupported granularity '{granularity}' (use hour or day)"}), 400
+    user_id = None
+    if request.args.get('user_id'):
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'Unauthorized'}), 401
+        user_id, forbidden = own_user_id(user)
+        if forbidden:
+            return forbidden
+    try:
+        date_from = parse_date_param('from')
+        date_to = parse_date_param('to')
+    except ValueError as e:
+        return jsonify({'error': f'Invalid date: {e}'}), 400
+    if date_from:
+        # Start from the bucket containing `from`
+        bucket_format = ROLLUP_GRANULARITIES[granularity][1]
+        date_from = datetime.strptime(date_from, '%Y-%m-%d %H:%M:%S').strftime(bucket_format)
+    
+    with metrics.stage('db_read'):
+        buckets = get_sentiment_rollups(granularity, user_id, date_from, date_to)
+    
+    totals = {'analyses': 0, 'sentiments': {}}
+    for bucket in buckets:
+        totals['analyses'] += bucket['analyses']
+        for sentiment, count in bucket['sentiments'].items():
+            totals['sentiments'][sentiment] = totals['sentiments'].get(sentiment, 0) + count
+    return jsonify({
+        'granularity': granularity,
+        'user_id': user_id,
+        'from': date_from,
+        'to': date_to,
+        'buckets': buckets,
+        'totals': totals
+    })
+
+@api.route('/api/analyses/export', methods=['GET'])
+def export_analyses():
+    """Stream the current user's analyses as CSV or NDJSON, filtered by sentiment and date range"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Unauthorized'}), 401
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unsupported format '{fmt}' (use csv or ndjson)"}), 400
+    _, forbidden = own_user_id(user)
+    if forbidden:
+        return forbidden
+    try:
+        date_from = parse_date_param('from')
+        date_to = parse_date_param('to')
+    except ValueError as e:
+        return jsonify({'error': f'Invalid date: {e}'}), 400
+    
+    sql, params = build_export_query(
+        user_id=user['id'],
+        sentiment=request.args.get('sentiment'),
+        date_from=date_from,
+        date_to=date_to
+    )
+    compress = (
+        request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+        or 'gzip' in request.accept_encodings
+    )
+    headers = {
+        'Content-Disposition': f'attachment; filename="analyses.{fmt}"'
+    }
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+    return Response(
+        stream_with_context(stream_export(fmt, sql, params, compress=compress)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers=headers
+    )
+
+def paged_response(select_sql, alias, filters=None, params=None):
+    """Serve one keyset page using the `after` cursor and `limit` query params"""
+    limit = clamp_page_size(request.args.get('limit'))
+    connection = get_db_connection()
+    try:
+        with metrics.stage('db_read'):
+            items, next_cursor = fetch_page(
+                connection, select_sql, alias, filters, params,
+                cursor=request.args.get('after'), limit=limit
+            )
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    finally:
+        connection.close()
+    return jsonify({'items': items, 'next_cursor': next_cursor, 'limit': limit})
+
+@api.route('/api/users', methods=['GET'])
+def list_users():
+    """Users, newest first, one keyset page at a time (admins only)"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Unauthorized'}), 401
+    if not is_admin(user):
+        return jsonify({'error': 'Admin access required'}), 403
+    return paged_response(
+        "SELECT u.id, u.email, u.name, u.provider, u.created_at FROM users u", 'u'
+    )
+
+@api.route('/api/analyses', methods=['GET'])
+def list_analyses():
+    """The caller's analyses, newest first; filter with sentiment"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Unauthorized'}), 401
+    user_id, forbidden = own_user_id(user)
+    if forbidden:
+        return forbidden
+    filters, params = ["ua.user_id = ?"], [user_id]
+    if request.args.get('sentiment'):
+        filters.append("ua.sentiment = ?")
+        params.append(request.args['sentiment'])
+    return paged_response("""
+        SELECT ua.id, ua.user_id, u.email, ua.feedback_text, ua.sentiment,
+               ua.confidence, ua.tier, ua.created_at
+        FROM user_analyses ua
+        LEFT JOIN users u ON ua.user_id = u.id
+    """, 'ua', filters, params)
+
+@api.route('/api/sessions', methods=['GET'])
+def list_sessions():
+    """The caller's sessions, newest first"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Unauthorized'}), 401
+    user_id, forbidden = own_user_id(user)
+    if forbidden:
+        return forbidden
+    return paged_response("""
+        SELECT us.id, us.user_id, u.email, us.created_at, us.expires_at
+        FROM user_sessions us
+        LEFT JOIN users u ON us.user_id = u.id
+    """, 'us', ["us.user_id = ?"], [user_id])
 
 # Data viewer endpoint to see all database data
-@app.route('/api/data', methods=['GET'])
+@api.route('/api/data', methods=['GET'])
 def view_data():
     try:
+        # Table counts come from the trigger-maintained counters, not COUNT(*)
+        # scans. Read them before checking out a connection: get_counts() takes
+        # its own, and holding one while waiting for another can exhaust the pool
+        counts = get_counts()
         connection = get_db_connection()
         cursor = connection.cursor()
         
-        data = {}
+        data = {'counts': counts}
         
-        # Get users
-        cursor.execute("SELECT id, email, name, created_at FROM users ORDER BY created_at DESC")
-        data['users'] = [dict(row) for row in cursor.fetchall()]
+        with metrics.stage('db_read'):
+            # Get users (latest page only; use /api/users to page through the rest)
+            cursor.execute("SELECT id, email, name, created_at FROM users ORDER BY created_at DESC LIMIT 50")
+            data['users'] = [dict(row) for row in cursor.fetchall()]
         
-        # Get analyses
-        cursor.execute("""
-            SELECT ua.id, ua.user_id, u.email, ua.feedback_text, ua.sentiment, 
-                   ua.confidence, ua.created_at 
-            FROM user_analyses ua 
-            LEFT JOIN users u ON ua.user_id = u.id 
-            ORDER BY ua.created_at DESC
-            LIMIT 50
-        """)
-        data['analyses'] = [dict(row) for row in cursor.fetchall()]
-        
-        # Get sessions
-        cursor.execute("""
-            SELECT us.id, us.user_id, u.email, us.created_at, us.expires_at
-            FROM user_sessions us 
-            LEFT JOIN users u ON us.user_id = u.id 
-            ORDER BY us.created_at DESC
-            LIMIT 20
-        """)
-        data['sessions'] = [dict(row) for row in cursor.fetchall()]
-        
-        # Get table counts
-        cursor.execute("SELECT COUNT(*) as count FROM users")
-        data['counts'] = {'users': cursor.fetchone()['count']}
-        
-        cursor.execute("SELECT COUNT(*) as count FROM user_analyses")
-        data['counts']['analyses'] = cursor.fetchone()['count']
+            # Get analyses
+            cursor.execute("""
+                SELECT ua.id, ua.user_id, u.email, ua.feedback_text, ua.sentiment, 
+                       ua.confidence, ua.created_at 
+                FROM user_analyses ua 
+                LEFT JOIN users u ON ua.user_id = u.id 
+                ORDER BY ua.created_at DESC
+                LIMIT 50
+            """)
+            data['analyses'] = [dict(row) for row in cursor.fetchall()]
         
-        cursor.execute("SELECT COUNT(*) as count FROM user_sessions")
-        data['counts']['sessions'] = cursor.fetchone()['count']
+            # Get sessions
+            cursor.execute("""
+                SELECT us.id, us.user_id, u.email, us.created_at, us.expires_at
+                FROM user_sessions us 
+                LEFT JOIN users u ON us.user_id = u.id 
+                ORDER BY us.created_at DESC
+                LIMIT 20
+            """)
+            data['sessions'] = [dict(row) for row in cursor.fetchall()]
         
         connection.close()
         
@@ -268,19 +822,14 @@ def view_data():
         return jsonify({'error': str(e)}), 500
 
 # Simple data viewer endpoint that works with current connection
-@app.route('/api/data-view', methods=['GET'])
-def view_database():
-    try:
-        from database import get_db_connection
-        connection = get_db_connection()
-        
-        html = """
+DATA_VIEW_HEAD = """
         <html>
         <head>
             <title>Database Viewer - Feedback Analyzer</title>
             <style>
                 body { font-family: Arial, sans-serif; margin: 20px; background: #1a1a1a; color: #fff; }
                 h1, h2 { color: #4CAF50; }
+                a { color: #4CAF50; }
                 table { border-collapse: collapse; width: 100%; margin: 20px 0; background: #2a2a2a; }
                 th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
                 th { background-color: #4CAF50; color: white; }
@@ -291,105 +840,108 @@ def view_database():
         </head>
         <body>
             <h1>📊 Feedback Analyzer Database Viewer</h1>
-            <p class="timestamp">Generated: """ + str(datetime.now()) + """</p>
-        """
-        
-        with connection.cursor() as cursor:
-            # Get counts
-            cursor.execute("SELECT COUNT(*) as count FROM users")
-            user_count = cursor.fetchone()['count']
-            
-            cursor.execute("SELECT COUNT(*) as count FROM user_analyses")
-            analysis_count = cursor.fetchone()['count']
-            
-            cursor.execute("SELECT COUNT(*) as count FROM user_sessions")
-            session_count = cursor.fetchone()['count']
-            
-            html += f"""
+"""
+
+# (title, cursor query param, SELECT, alias, [(header, column, max chars or None)])
+DATA_VIEW_TABLES = [
+    ('👥 Users Table', 'users_after',
+     "SELECT u.id, u.email, u.name, u.created_at FROM users u", 'u',
+     [('ID', 'id', None), ('Email', 'email', None), ('Name', 'name', None),
+      ('Created', 'created_at', None)]),
+    ('📊 Analysis Data', 'analyses_after',
+     "SELECT ua.id, ua.user_id, ua.feedback_text, ua.sentiment, ua.confidence, ua.created_at FROM user_analyses ua", 'ua',
+     [('ID', 'id', None), ('User ID', 'user_id', None), ('Feedback Text', 'feedback_text', 100),
+      ('Sentiment', 'sentiment', None), ('Confidence', 'confidence', None), ('Created', 'created_at', None)]),
+    ('🔑 Session Data', 'sessions_after',
+     "SELECT us.id, us.user_id, us.created_at, us.expires_at FROM user_sessions us", 'us',
+     [('ID', 'id', None), ('User ID', 'user_id', None), ('Created', 'created_at', None),
+      ('Expires', 'expires_at', None)]),
+]
+DATA_VIEW_FETCH_SIZE = 100
+
+def render_cell(value, max_chars=None):
+    """Escape a cell value, truncating long text"""
+    if value is None:
+        return 'N/A'
+    text = str(value)
+    if max_chars and len(text) > max_chars:
+        text = text[:max_chars] + '...'
+    return escape(text)
+
+def stream_data_view(counts, cursors, limit):
+    """Yield the viewer page table by table, reading rows in fetchmany batches"""
+    yield DATA_VIEW_HEAD
+    yield f'<p class="timestamp">Generated: {escape(str(datetime.now()))}</p>\n'
+    yield f"""
             <div>
-                <span class="count">👥 Users: {user_count}</span>
-                <span class="count">📊 Analyses: {analysis_count}</span>
-                <span class="count">🔑 Sessions: {session_count}</span>
+                <span class="count">👥 Users: {counts['users']}</span>
+                <span class="count">📊 Analyses: {counts['analyses']}</span>
+                <span class="count">🔑 Sessions: {counts['sessions']}</span>
             </div>
-            
-            <h2>👥 Users Table</h2>
-            <table>
-                <tr><th>ID</th><th>Email</th><th>Name</th><th>Created</th></tr>
-            """
-            
-            cursor.execute("SELECT * FROM users ORDER BY created_at DESC")
-            users = cursor.fetchall()
-            
-            for user in users:
-                html += f"""
-                <tr>
-                    <td>{user['id']}</td>
-                    <td>{user['email']}</td>
-                    <td>{user.get('name', 'N/A')}</td>
-                    <td>{user['created_at']}</td>
-                </tr>
-                """
-            
-            html += """
-            </table>
-            
-            <h2>📊 Analysis Data</h2>
-            <table>
-                <tr><th>ID</th><th>User ID</th><th>Feedback Text</th><th>Sentiment</th><th>Confidence</th><th>Created</th></tr>
-            """
-            
-            cursor.execute("SELECT * FROM user_analyses ORDER BY created_at DESC LIMIT 20")
-            analyses = cursor.fetchall()
-            
-            for analysis in analyses:
-                feedback_text = (analysis.get('feedback_text') or 'N/A')[:100] + '...'
-                html += f"""
-                <tr>
-                    <td>{analysis['id']}</td>
-                    <td>{analysis['user_id']}</td>
-                    <td>{feedback_text}</td>
-                    <td>{analysis.get('sentiment', 'N/A')}</td>
-                    <td>{analysis.get('confidence', 'N/A')}</td>
-                    <td>{analysis['created_at']}</td>
-                </tr>
-                """
-            
-            html += """
-            </table>
-            
-            <h2>🔑 Session Data</h2>
-            <table>
-                <tr><th>ID</th><th>User ID</th><th>Created</th><th>Expires</th></tr>
-            """
-            
-            cursor.execute("SELECT * FROM user_sessions ORDER BY created_at DESC LIMIT 10")
-            sessions = cursor.fetchall()
-            
-            for session in sessions:
-                html += f"""
-                <tr>
-                    <td>{session['id']}</td>
-                    <td>{session['user_id']}</td>
-                    <td>{session['created_at']}</td>
-                    <td>{session.get('expires_at', 'N/A')}</td>
-                </tr>
-                """
-            
-            html += """
-            </table>
-            </body>
-            </html>
-            """
-        
+"""
+    connection = get_db_connection()
+    try:
+        for title, cursor_param, select_sql, alias, columns in DATA_VIEW_TABLES:
+            yield f"<h2>{title}</h2>\n<table>\n<tr>"
+            yield ''.join(f"<th>{header}</th>" for header, _, _ in columns) + "</tr>\n"
+            sql, params = build_page_query(
+                select_sql, alias, cursor=cursors.get(cursor_param), limit=limit
+            )
+            cursor = connection.execute(sql, params)
+            shown = 0
+            last = None
+            has_more = False
+            while True:
+                rows = cursor.fetchmany(DATA_VIEW_FETCH_SIZE)
+                if not rows:
+                    break
+                if shown + len(rows) > limit:
+                    has_more = True
+                    rows = rows[:limit - shown]
+                yield ''.join(
+                    "<tr>" + ''.join(
+                        f"<td>{render_cell(row[column], max_chars)}</td>"
+                        for _, column, max_chars in columns
+                    ) + "</tr>\n"
+                    for row in rows
+                )
+                shown += len(rows)
+                if rows:
+                    last = rows[-1]
+                if has_more:
+                    break
+            yield "</table>\n"
+            if has_more and last is not None:
+                args = request.args.to_dict()
+                args[cursor_param] = encode_cursor(last['created_at'], last['id'])
+                yield f'<p><a href="?{escape(urlencode(args))}">Next {limit} rows &rarr;</a></p>\n'
+    finally:
         connection.close()
-        return html, 200, {'Content-Type': 'text/html'}
-        
+    yield "</body>\n</html>\n"
+
+@api.route('/api/data-view', methods=['GET'])
+def view_database():
+    try:
+        limit = clamp_page_size(request.args.get('limit', 20))
+        cursors = {
+            cursor_param: request.args.get(cursor_param)
+            for _, cursor_param, _, _, _ in DATA_VIEW_TABLES
+        }
+        for cursor_value in cursors.values():
+            if cursor_value:
+                decode_cursor(cursor_value)
+        counts = get_counts()
     except Exception as e:
-        return f"<h1>Database Error</h1><p>{str(e)}</p>", 500, {'Content-Type': 'text/html'}
+        return f"<h1>Database Error</h1><p>{escape(str(e))}</p>", 500, {'Content-Type': 'text/html'}
+    
+    return Response(
+        stream_with_context(stream_data_view(counts, cursors, limit)),
+        mimetype='text/html'
+    )
+
+startup_report['import_seconds'] = round(time.perf_counter() - _IMPORT_STARTED, 4)
 
 if __name__ == '__main__':
-    # Initialize database
-    create_tables()
-    
+    app = create_app()
     port = int(os.environ.get('PORT', 5500))
     app.run(debug=True, host='0.0.0.0', port=port)
@@ -1,9 +1,16 @@
 import bcrypt
 import jwt
 import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from flask import jsonify
 from database_sqlite import get_db_connection
+from ttl_cache import TTLCache
+from session_store import session_store, token_hash
+import metrics
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,13 +19,80 @@ JWT_SECRET = os.getenv('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24
 
+# Caches for authenticated requests: verified token -> payload, user_id -> user row
+AUTH_CACHE_SIZE = int(os.getenv('AUTH_CACHE_SIZE', 10000))
+AUTH_CACHE_TTL = int(os.getenv('AUTH_CACHE_TTL', 300))
+_token_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+_user_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+_lookup_lock = threading.Lock()
+_lookup_stats = {'lookups': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+
+# bcrypt runs on a small dedicated pool so login bursts cannot tie up every
+# request thread; when too many calls are pending we fail fast instead.
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', 2))
+BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING', 32))
+_bcrypt_pool = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix='bcrypt')
+_bcrypt_slots = threading.BoundedSemaphore(BCRYPT_MAX_PENDING)
+
+class AuthBusyError(Exception):
+    """Raised when the password hashing pool is saturated"""
+
+def _submit_bcrypt(fn, *args):
+    """Queue work on the bcrypt pool, or raise AuthBusyError if it is full"""
+    if not _bcrypt_slots.acquire(blocking=False):
+        raise AuthBusyError('Authentication service is busy, please retry shortly')
+    try:
+        future = _bcrypt_pool.submit(fn, *args)
+    except Exception:
+        _bcrypt_slots.release()
+        raise
+    future.add_done_callback(lambda _: _bcrypt_slots.release())
+    return future
+
+def _hashpw(password):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+def _checkpw(password, password_hash):
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
 def hash_password(password):
     """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return _submit_bcrypt(_hashpw, password).result()
 
 def verify_password(password, password_hash):
     """Verify a password against its hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    return _submit_bcrypt(_checkpw, password, password_hash).result()
+
+def needs_rehash(password_hash):
+    """True when a bcrypt hash was made with a cost other than BCRYPT_ROUNDS"""
+    try:
+        return int(password_hash.split('$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+def _rehash_password(user_id, password, old_hash):
+    new_hash = _hashpw(password)
+    connection = get_db_connection()
+    try:
+        cursor = connection.cursor()
+        # Only replace the hash we verified, in case the password changed meanwhile
+        cursor.execute(
+            "UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?",
+            (new_hash, user_id, old_hash)
+        )
+        connection.commit()
+    except Exception as e:
+        print(f"Error rehashing password for user {user_id}: {e}")
+    finally:
+        connection.close()
+
+def schedule_rehash(user_id, password, old_hash):
+    """Upgrade a hash to the current cost in the background; skipped when busy"""
+    try:
+        _submit_bcrypt(_rehash_password, user_id, password, old_hash)
+    except AuthBusyError:
+        pass  # Try again on the next successful login
 
 def generate_token(user_id, email):
     """Generate a JWT token for a user"""
@@ -26,7 +100,9 @@ def generate_token(user_id, email):
         'user_id': user_id,
         'email': email,
         'exp': datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS),
-        'iat': datetime.utcnow()
+        'iat': datetime.utcnow(),
+        # Unique per token, so sessions issued in the same second revoke independently
+        'jti': secrets.token_hex(8)
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
@@ -40,8 +116,101 @@ def verify_token(token):
     except jwt.InvalidTokenError:
         return None
 
+def verify_token_cached(token):
+    """
+    verify_token() with a cache of already-verified tokens (never past their
+    exp); revoked tokens are rejected from the in-memory revocation set
+    """
+    key = token_hash(token)
+    if session_store.is_revoked(key):
+        return None
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return payload if payload['exp'] > time.time() else None
+    payload = verify_token(token)
+    if payload:
+        _token_cache.set(key, payload, ttl=payload['exp'] - time.time())
+    return payload
+
+def issue_token(user_id, email):
+    """generate_token() plus a user_sessions row so the token can be revoked"""
+    token = generate_token(user_id, email)
+    payload = verify_token_cached(token)
+    try:
+        session_store.record(user_id, token_hash(token), payload['exp'])
+    except Exception as e:
+        # Still revocable: revoke() records unknown tokens as it revokes them
+        print(f"Error recording session for user {user_id}: {e}")
+    return token
+
+def revoke_token(token):
+    """Log out one token; returns False when the token is not valid"""
+    payload = verify_token_cached(token)
+    if not payload:
+        return False
+    session_store.revoke(payload['user_id'], token_hash(token), payload['exp'])
+    return True
+
+def revoke_all_tokens(token):
+    """Log out every session of the token's user; returns the number revoked, or None"""
+    payload = verify_token_cached(token)
+    if not payload:
+        return None
+    revoked = session_store.revoke_user(payload['user_id'])
+    if not session_store.is_revoked(token_hash(token)):
+        # Token issued before sessions were recorded
+        session_store.revoke(payload['user_id'], token_hash(token), payload['exp'])
+        revoked += 1
+    return revoked
+
+def get_cached_user_by_id(user_id):
+    """get_user_by_id() served from the user cache when possible"""
+    user = _user_cache.get(user_id)
+    if user is None:
+        with metrics.stage('db_read'):
+            user = get_user_by_id(user_id)
+        if user:
+            _user_cache.set(user_id, user)
+    return dict(user) if user else None
+
+def invalidate_user(user_id):
+    """Drop a cached user row; call after any change to the users table"""
+    _user_cache.delete(user_id)
+
+def get_user_from_token(token):
+    """Resolve a bearer token to its user row, recording lookup latency"""
+    started = time.perf_counter()
+    try:
+        payload = verify_token_cached(token)
+        return get_cached_user_by_id(payload['user_id']) if payload else None
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with _lookup_lock:
+            _lookup_stats['lookups'] += 1
+            _lookup_stats['total_ms'] += elapsed_ms
+            _lookup_stats['max_ms'] = max(_lookup_stats['max_ms'], elapsed_ms)
+
+def get_auth_cache_stats():
+    """Hit ratios of the token/user caches and token-to-user lookup latency"""
+    with _lookup_lock:
+        lookups = _lookup_stats['lookups']
+        latency = {
+            'lookups': lookups,
+            'avg_ms': round(_lookup_stats['total_ms'] / lookups, 4) if lookups else 0.0,
+            'max_ms': round(_lookup_stats['max_ms'], 4)
+        }
+    return {
+        'tokens': _token_cache.stats(),
+        'users': _user_cache.stats(),
+        'lookup_latency': latency,
+        'sessions': session_store.stats()
+    }
+
 def register_user(email, password, name=None):
     """Register a new user"""
+    # Hash before checking out a connection: bcrypt may queue behind other
+    # logins, and a pooled connection must not be held while it waits
+    password_hash = hash_password(password)
     connection = get_db_connection()
     try:
         cursor = connection.cursor()
@@ -50,8 +219,6 @@ def register_user(email, password, name=None):
         if cursor.fetchone():
             return None, "User with this email already exists"
         
-        # Hash password and insert user
-        password_hash = hash_password(password)
         cursor.execute("""
             INSERT INTO users (email, password_hash, name, provider)
             VALUES (?, ?, ?, 'local')
@@ -80,22 +247,31 @@ def authenticate_user(email, password):
             FROM users WHERE email = ? AND provider = 'local'
         """, (email,))
         row = cursor.fetchone()
-        
-        if not row:
-            return None, "Invalid email or password"
-        
-        user = dict(row)
-        
-        if not verify_password(password, user['password_hash']):
-            return None, "Invalid email or password"
-        
-        # Remove password_hash from response
-        user.pop('password_hash', None)
-        return user, None
     except Exception as e:
         return None, str(e)
     finally:
+        # Released before bcrypt, which may queue behind other logins
         connection.close()
+    
+    if not row:
+        return None, "Invalid email or password"
+    
+    user = dict(row)
+    
+    try:
+        if not verify_password(password, user['password_hash']):
+            return None, "Invalid email or password"
+    except AuthBusyError:
+        raise
+    except Exception as e:
+        return None, str(e)
+    
+    if needs_rehash(user['password_hash']):
+        schedule_rehash(user['id'], password, user['password_hash'])
+    
+    # Remove password_hash from response
+    user.pop('password_hash', None)
+    return user, None
 
 def get_user_by_id(user_id):
     """Get user by ID"""
@@ -150,6 +326,7 @@ def create_or_update_oauth_user(email, name, provider, provider_id, avatar_url=N
                 WHERE email = ?
             """, (name, provider, provider_id, avatar_url, email))
             connection.commit()
+            invalidate_user(user['id'])
             cursor.execute("""
                 SELECT id, email, name, provider, avatar_url
                 FROM users WHERE email = ?
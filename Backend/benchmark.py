@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the backend.
+
+Runs everything in-process: endpoints go through Flask's test client, data
+lives in a temporary SQLite database and the LLM backends use a fake chat
+model, so no server, network or API key is needed. Results are written as
+JSON so runs can be compared across releases.
+
+    python benchmark.py                          # writes benchmark-results.json
+    python benchmark.py --quick --output run.json
+    python benchmark.py --backend llm --llm-latency 0.02
+    python benchmark.py --backend llm_sklearn     # trains a throwaway model if none is saved
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+TEXT_SIZES = {'short': 8, 'medium': 64, 'long': 512}  # words per text
+WORDS = ['the', 'service', 'was', 'great', 'but', 'delivery', 'slow', 'and',
+         'support', 'helpful', 'app', 'crashes', 'love', 'price', 'okay', 'terrible']
+
+
+def make_text(words, seed=0):
+    return ' '.join(WORDS[(seed + i * 7) % len(WORDS)] for i in range(words))
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize_latencies(samples):
+    """Latency summary in milliseconds"""
+    return {
+        'requests': len(samples),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3)
+    }
+
+
+def measure_rate(func, iterations):
+    """Call func(i) `iterations` times and return operations per second"""
+    started = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    elapsed = time.perf_counter() - started
+    return round(iterations / elapsed, 1) if elapsed else None
+
+
+def bench_analyzer(iterations):
+    """llm_mock.analyze_feedback throughput for each text size"""
+    import llm_mock
+
+    results = {}
+    for name, words in TEXT_SIZES.items():
+        texts = [make_text(words, seed) for seed in range(16)]
+        count = max(1, iterations * TEXT_SIZES['short'] // words)
+        calls_per_sec = measure_rate(
+            lambda i: llm_mock.analyze_feedback(texts[i % len(texts)], generate_reply=False), count
+        )
+        chars = len(texts[0])
+        results[name] = {
+            'words': words,
+            'chars': chars,
+            'iterations': count,
+            'calls_per_sec': calls_per_sec,
+            'chars_per_sec': round(calls_per_sec * chars, 1)
+        }
+    return results
+
+
+def bench_tokens(iterations):
+    """JWT issue/verify rates, uncached and through the auth token cache"""
+    from auth import generate_token, verify_token, verify_token_cached
+
+    tokens = [generate_token(i, f'bench{i}@example.com') for i in range(256)]
+    return {
+        'iterations': iterations,
+        'generate_token_per_sec': measure_rate(lambda i: generate_token(i, f'bench{i}@example.com'), iterations),
+        'verify_token_per_sec': measure_rate(lambda i: verify_token(tokens[i % len(tokens)]), iterations),
+        'verify_token_cached_per_sec': measure_rate(lambda i: verify_token_cached(tokens[i % len(tokens)]), iterations)
+    }
+
+
+def bench_inserts(user_id, rows, batch_size):
+    """Rows per second for one commit per row versus save_analyses() batches"""
+    from database_sqlite import get_db_connection, save_analyses
+
+    created_at = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    data = [(user_id, make_text(12, i), 'positive', 0.8, created_at, 'benchmark') for i in range(rows)]
+
+    def insert_one(i):
+        connection = get_db_connection()
+        try:
+            connection.execute("""
+                INSERT INTO user_analyses (user_id, feedback_text, sentiment, confidence, created_at, tier)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, data[i])
+            connection.commit()
+        finally:
+            connection.close()
+
+    batches = [data[i:i + batch_size] for i in range(0, rows, batch_size)]
+    single = measure_rate(insert_one, rows)
+    batched_started = time.perf_counter()
+    for batch in batches:
+        save_analyses(batch)
+    batched_elapsed = time.perf_counter() - batched_started
+    batched = round(rows / batched_elapsed, 1) if batched_elapsed else None
+    return {
+        'rows': rows,
+        'batch_size': batch_size,
+        'single_rows_per_sec': single,
+        'batched_rows_per_sec': batched,
+        'speedup': round(batched / single, 2) if single and batched else None
+    }
+
+
+def bench_endpoints(client, credentials, token, requests, warmup=5):
+    """p50/p99 latency of /api/analyze, /api/auth/login and /api/data"""
+    headers = {'Authorization': f'Bearer {token}'}
+    calls = {
+        '/api/analyze': lambda i: client.post(
+            '/api/analyze', json={'feedback': f'{make_text(24, i)} #{i}'}, headers=headers
+        ),
+        '/api/auth/login': lambda i: client.post('/api/auth/login', json=credentials),
+        '/api/data': lambda i: client.get('/api/data'),
+    }
+    # bcrypt makes login far slower than the other routes; sample it less
+    counts = {'/api/analyze': requests, '/api/auth/login': max(5, requests // 10), '/api/data': requests}
+
+    results = {}
+    for route, call in calls.items():
+        for i in range(warmup):
+            call(-1 - i)
+        samples = []
+        errors = 0
+        for i in range(counts[route]):
+            started = time.perf_counter()
+            response = call(i)
+            samples.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+        results[route] = dict(summarize_latencies(samples), errors=errors)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ensure_sklearn_model(workdir):
+    """Use the configured scikit-learn model, or train a throwaway one so the run stays offline"""
+    import llm_sklearn
+
+    if os.path.exists(llm_sklearn.MODEL_PATH):
+        return
+    samples = {
+        'positive': ['great service', 'love the app', 'support was helpful', 'fast delivery, great price'],
+        'negative': ['terrible support', 'the app crashes', 'delivery was slow', 'price is terrible'],
+        'neutral': ['the service was okay', 'it is an app', 'delivery and price', 'okay'],
+    }
+    csv_path = os.path.join(workdir, 'sklearn-train.csv')
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write('text,sentiment\n')
+        for sentiment, texts in samples.items():
+            f.writelines(f'"{text}",{sentiment}\n' for text in texts)
+    llm_sklearn.MODEL_PATH = os.path.join(workdir, 'sentiment.joblib')
+    llm_sklearn.train_model(csv_path)
+
+
+def run(args, workdir):
+    # Point every module at the scratch database before any of them is imported
+    os.environ['SQLITE_DB_PATH'] = os.path.join(workdir, 'benchmark.db')
+    os.environ['ANALYZER_BACKEND'] = args.backend
+    os.environ['ANALYSIS_CACHE_SIZE'] = '0'  # measure the analyzer, not the result cache
+    os.environ['RATE_LIMIT_ENABLED'] = 'false'  # the benchmark is one client sending back-to-back requests
+    os.environ.setdefault('OPENAI_API_KEY', 'benchmark-key-not-used')
+
+    if args.backend == 'llm_sklearn':
+        ensure_sklearn_model(workdir)
+
+    if args.backend in ('llm', 'llm_cascade'):
+        import llm
+        from llm_fake import SlowFakeChatModel
+        llm.set_model(SlowFakeChatModel(latency=args.llm_latency))
+
+    import app as backend_app
+    from auth import register_user
+
+    backend_app.create_tables()
+    credentials = {'email': 'benchmark@example.com', 'password': 'benchmark-password'}
+    user, error = register_user(credentials['email'], credentials['password'], 'Benchmark')
+    if error:
+        raise RuntimeError(f'Could not create benchmark user: {error}')
+    client = backend_app.create_app().test_client()
+    token = client.post('/api/auth/login', json=credentials).get_json()['token']
+
+    scale = 10 if args.quick else 1
+    results = {
+        'meta': {
+            'timestamp': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sqlite': sqlite3.sqlite_version,
+            'backend': args.backend,
+            'llm_latency': args.llm_latency if args.backend in ('llm', 'llm_cascade') else None,
+            'quick': args.quick
+        },
+        'startup': backend_app.startup_report
+    }
+    print("Benchmarking analyzer throughput...", file=sys.stderr)
+    results['analyzer'] = bench_analyzer(args.iterations // scale)
+    print("Benchmarking token issue/verify...", file=sys.stderr)
+    results['tokens'] = bench_tokens(args.iterations // scale)
+    print("Benchmarking inserts...", file=sys.stderr)
+    results['inserts'] = bench_inserts(user['id'], args.insert_rows // scale, args.batch_size)
+    print("Benchmarking endpoints...", file=sys.stderr)
+    results['endpoints'] = bench_endpoints(client, credentials, token, args.requests // scale)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Offline backend benchmarks (results as JSON)')
+    parser.add_argument('--output', default='benchmark-results.json', help="JSON file to write ('-' for stdout)")
+    parser.add_argument('--backend', default='llm_mock', choices=['llm_mock', 'llm_sklearn', 'llm', 'llm_cascade'],
+                        help='analyzer behind /api/analyze (llm backends use a fake chat model)')
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='seconds per fake LLM call')
+    parser.add_argument('--iterations', type=int, default=20000, help='calls per analyzer/token benchmark')
+    parser.add_argument('--insert-rows', type=int, default=2000, help='rows per insert benchmark')
+    parser.add_argument('--batch-size', type=int, default=500, help='rows per save_analyses() call')
+    parser.add_argument('--requests', type=int, default=500, help='requests per endpoint')
+    parser.add_argument('--quick', action='store_true', help='run a tenth of the iterations (smoke test)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # With --output -, keep startup/migration messages out of the JSON on stdout
+    log_target = sys.stderr if args.output == '-' else sys.stdout
+    with tempfile.TemporaryDirectory(prefix='feedback-bench-') as workdir, redirect_stdout(log_target):
+        results = run(args, workdir)
+    output = json.dumps(results, indent=2)
+    if args.output == '-':
+        print(output)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"Results written to {args.output}", file=sys.stderr)
+    return results
+
+
+if __name__ == '__main__':
+    main()
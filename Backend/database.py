@@ -1,22 +1,267 @@
 import pymysql
 import os
+import threading
+import time
+from collections import deque
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Connection pool settings
+MYSQL_POOL_MIN = int(os.getenv('MYSQL_POOL_MIN', 1))
+MYSQL_POOL_MAX = int(os.getenv('MYSQL_POOL_MAX', 10))
+MYSQL_POOL_TIMEOUT = float(os.getenv('MYSQL_POOL_TIMEOUT', 10))
+MYSQL_POOL_PING_INTERVAL = float(os.getenv('MYSQL_POOL_PING_INTERVAL', 30))
+MYSQL_POOL_IDLE_TIMEOUT = float(os.getenv('MYSQL_POOL_IDLE_TIMEOUT', 300))
+MYSQL_POOL_MAX_LIFETIME = float(os.getenv('MYSQL_POOL_MAX_LIFETIME', 3600))
+
+def _connect():
+    """Open a new MySQL connection with the configured credentials"""
+    return pymysql.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        database=os.getenv('DB_NAME', 'feedback_analyser'),
+        port=int(os.getenv('DB_PORT', 3306)),
+        cursorclass=pymysql.cursors.DictCursor,
+        autocommit=True
+    )
+
+
+class _PoolEntry:
+    __slots__ = ('connection', 'created_at', 'last_used')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = self.last_used = time.monotonic()
+
+
+class PooledConnection:
+    """Checked-out MySQL connection; close() returns it to the pool"""
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get('_entry')
+        if entry is None:
+            raise pymysql.err.InterfaceError("Connection already returned to the pool")
+        return getattr(entry.connection, name)
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool.release(entry)
+
+    def __del__(self):
+        # Safety net for code paths that forget to call close()
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class MySQLConnectionPool:
+    """
+    Thread-safe MySQL connection pool with min/max size, checkout timeout,
+    ping-before-use for connections idle longer than `ping_interval`, idle
+    reaping above `min_size` and a maximum connection lifetime.
+
+    Idle connections sit in a deque, most recently released on the right, so
+    checkout is LIFO and the ones idle longest are always on the left. The
+    open count is reserved under the lock before connecting, so at most
+    max_size connections exist, idle or checked out.
+    """
+
+    def __init__(self, connect=_connect, min_size=MYSQL_POOL_MIN, max_size=MYSQL_POOL_MAX,
+                 timeout=MYSQL_POOL_TIMEOUT, ping_interval=MYSQL_POOL_PING_INTERVAL,
+                 idle_timeout=MYSQL_POOL_IDLE_TIMEOUT, max_lifetime=MYSQL_POOL_MAX_LIFETIME):
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._open_count = 0
+        self._pid = os.getpid()
+        self._stats = {
+            'opened': 0,
+            'closed': 0,
+            'checkouts': 0,
+            'reused': 0,
+            'pings': 0,
+            'ping_failures': 0,
+            'expired': 0,
+            'reaped': 0,
+            'timeouts': 0,
+            'wait_ms_total': 0.0,
+            'wait_ms_max': 0.0
+        }
+        for _ in range(min(min_size, max_size)):
+            with self._lock:
+                self._open_count += 1
+            self._idle.append(self._open())
+
+    def _open(self):
+        """Connect for a slot already counted in _open_count"""
+        try:
+            entry = _PoolEntry(self._connect())
+        except Exception:
+            with self._lock:
+                self._open_count -= 1
+                self._available.notify()
+            raise
+        with self._lock:
+            self._stats['opened'] += 1
+        return entry
+
+    def _close(self, entry):
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
+
+    def _discard(self, entry, reason=None):
+        self._close(entry)
+        with self._lock:
+            self._open_count -= 1
+            self._stats['closed'] += 1
+            if reason:
+                self._stats[reason] += 1
+            self._available.notify()
+
+    def _usable(self, entry, now):
+        """Drop expired connections and ping ones that sat idle for a while"""
+        if now - entry.created_at > self.max_lifetime:
+            self._discard(entry, 'expired')
+            return False
+        if now - entry.last_used > self.ping_interval:
+            with self._lock:
+                self._stats['pings'] += 1
+            try:
+                entry.connection.ping(reconnect=False)
+            except Exception:
+                self._discard(entry, 'ping_failures')
+                return False
+        return True
+
+    def acquire(self):
+        """Check out a live connection, waiting up to `timeout` for a free one"""
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        entry = None
+        reused = False
+        while entry is None:
+            with self._lock:
+                while not self._idle and self._open_count >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._available.wait(remaining):
+                        if self._idle or self._open_count < self.max_size:
+                            break
+                        self._stats['timeouts'] += 1
+                        raise pymysql.err.OperationalError(
+                            f"Timed out after {self.timeout}s waiting for a database connection"
+                        )
+                candidate = self._idle.pop() if self._idle else None
+                if candidate is None:
+                    self._open_count += 1
+            if candidate is None:
+                entry = self._open()
+            elif self._usable(candidate, time.monotonic()):
+                entry = candidate
+                reused = True
+
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['reused'] += int(reused)
+            self._stats['wait_ms_total'] += waited_ms
+            self._stats['wait_ms_max'] = max(self._stats['wait_ms_max'], waited_ms)
+        return PooledConnection(self, entry)
+
+    def release(self, entry):
+        """Return a connection to the pool, closing it if it is past its lifetime"""
+        now = time.monotonic()
+        entry.last_used = now
+        if self._pid != os.getpid() or now - entry.created_at > self.max_lifetime:
+            self._discard(entry, 'expired')
+            return
+        with self._lock:
+            self._idle.append(entry)
+            reaped = self._reap_idle(now)
+            self._available.notify()
+        for stale in reaped:
+            self._close(stale)
+
+    def _reap_idle(self, now):
+        """
+        Pop connections idle longer than idle_timeout, keeping min_size open.
+        Called with the lock held; only the expired entries at the left end are
+        touched, so the rest stay available to concurrent checkouts.
+        """
+        reaped = []
+        while (self._idle and now - self._idle[0].last_used > self.idle_timeout
+               and self._open_count > self.min_size):
+            reaped.append(self._idle.popleft())
+            self._open_count -= 1
+            self._stats['closed'] += 1
+            self._stats['reaped'] += 1
+        return reaped
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open_count -= len(idle)
+            self._stats['closed'] += len(idle)
+            self._available.notify_all()
+        for entry in idle:
+            self._close(entry)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['open'] = self._open_count
+            stats['idle'] = len(self._idle)
+        checkouts = stats['checkouts']
+        stats['in_use'] = stats['open'] - stats['idle']
+        stats['min_size'] = self.min_size
+        stats['max_size'] = self.max_size
+        stats['reuse_ratio'] = round(stats['reused'] / checkouts, 4) if checkouts else 0.0
+        stats['wait_ms_avg'] = round(stats['wait_ms_total'] / checkouts, 4) if checkouts else 0.0
+        stats['wait_ms_total'] = round(stats['wait_ms_total'], 3)
+        stats['wait_ms_max'] = round(stats['wait_ms_max'], 3)
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide MySQL pool, rebuilding it after a fork"""
+    global _pool
+    pool = _pool
+    if pool is None or pool._pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool._pid != os.getpid():
+                _pool = MySQLConnectionPool()
+            pool = _pool
+    return pool
+
+def get_connection_stats():
+    """Pool metrics for the MySQL backend"""
+    return get_pool().stats()
+
 def get_db_connection():
-    """Create and return a MySQL database connection"""
+    """Check out a MySQL database connection from the pool; close() returns it"""
     try:
-        connection = pymysql.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASSWORD', ''),
-            database=os.getenv('DB_NAME', 'feedback_analyser'),
-            port=int(os.getenv('DB_PORT', 3306)),
-            cursorclass=pymysql.cursors.DictCursor,
-            autocommit=True
-        )
-        return connection
+        return get_pool().acquire()
     except Exception as e:
         print(f"Error connecting to database: {e}")
         raise
@@ -1,20 +1,586 @@
 import sqlite3
 import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_db_connection():
-    """Create and return a SQLite database connection"""
-    try:
-        db_path = os.path.join(os.path.dirname(__file__), 'feedback_analyzer.db')
-        connection = sqlite3.connect(db_path)
+DB_PATH = os.getenv('SQLITE_DB_PATH') or os.path.join(os.path.dirname(__file__), 'feedback_analyzer.db')
+
+# Connection pool settings
+POOL_MAX_CONNECTIONS = int(os.getenv('SQLITE_POOL_MAX', 16))
+POOL_TIMEOUT_SECONDS = float(os.getenv('SQLITE_POOL_TIMEOUT', 10))
+BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+# How long a starting worker waits for another one to finish migrating
+MIGRATION_LOCK_TIMEOUT_SECONDS = float(os.getenv('SQLITE_MIGRATION_TIMEOUT', 300))
+
+# Applied once when a connection is opened, not on every checkout
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA cache_size=-65536",  # 64 MB
+    "PRAGMA foreign_keys=ON",
+)
+
+
+class PooledConnection:
+    """
+    Checked-out pool connection. Behaves like sqlite3.Connection, but close()
+    rolls back anything uncommitted and hands the connection back to the pool.
+    """
+
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name):
+        connection = self.__dict__.get('_connection')
+        if connection is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(connection, name)
+
+    def __enter__(self):
+        self._connection.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._connection.__exit__(exc_type, exc_value, traceback)
+
+    def close(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            self._pool.release(connection)
+
+    def __del__(self):
+        # Safety net for code paths that forget to call close()
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Thread-safe pool of tuned SQLite connections shared by all worker threads"""
+
+    def __init__(self, db_path, max_connections=POOL_MAX_CONNECTIONS, timeout=POOL_TIMEOUT_SECONDS):
+        self.db_path = db_path
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._stats = {
+            'opened': 0,
+            'closed': 0,
+            'checkouts': 0,
+            'reused': 0,
+            'timeouts': 0,
+            'wait_ms_total': 0.0,
+            'wait_ms_max': 0.0
+        }
+
+    def _open(self):
+        connection = sqlite3.connect(
+            self.db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False
+        )
         connection.row_factory = sqlite3.Row  # Enable dict-like access
+        for pragma in CONNECTION_PRAGMAS:
+            connection.execute(pragma)
+        with self._lock:
+            self._stats['opened'] += 1
         return connection
+
+    def acquire(self):
+        """Check out a connection, waiting up to `timeout` seconds for a free slot"""
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise sqlite3.OperationalError(
+                f"Timed out after {self.timeout}s waiting for a database connection"
+            )
+        try:
+            connection = self._idle.get_nowait()
+            reused = True
+        except queue.Empty:
+            try:
+                connection = self._open()
+            except Exception:
+                self._slots.release()
+                raise
+            reused = False
+
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['reused'] += int(reused)
+            self._stats['wait_ms_total'] += waited_ms
+            self._stats['wait_ms_max'] = max(self._stats['wait_ms_max'], waited_ms)
+        return PooledConnection(self, connection)
+
+    def release(self, connection):
+        """Return a connection to the idle set (or close it if it is unusable)"""
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            self._idle.put(connection)
+        except sqlite3.Error:
+            self._discard(connection)
+        finally:
+            self._slots.release()
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._stats['closed'] += 1
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close on release)"""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        checkouts = stats['checkouts']
+        stats['idle'] = self._idle.qsize()
+        stats['max_connections'] = self.max_connections
+        stats['reuse_ratio'] = round(stats['reused'] / checkouts, 4) if checkouts else 0.0
+        stats['wait_ms_avg'] = round(stats['wait_ms_total'] / checkouts, 4) if checkouts else 0.0
+        stats['wait_ms_total'] = round(stats['wait_ms_total'], 3)
+        stats['wait_ms_max'] = round(stats['wait_ms_max'], 3)
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, rebuilding it after a fork"""
+    global _pool
+    pool = _pool
+    if pool is None or pool._pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool._pid != os.getpid():
+                _pool = ConnectionPool(DB_PATH)
+            pool = _pool
+    return pool
+
+
+def get_connection_stats():
+    """Reuse and wait-time counters for the SQLite connection pool"""
+    return get_pool().stats()
+
+
+def get_db_connection():
+    """Check out a SQLite database connection from the pool; close() returns it"""
+    try:
+        return get_pool().acquire()
     except Exception as e:
         print(f"Error connecting to database: {e}")
         raise
 
+# created_at and every other timestamp column hold naive UTC in this format,
+# so they sort and compare correctly as strings
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def to_db_timestamp(value):
+    """
+    Normalize a datetime, ISO 8601 string (offset or trailing Z allowed) or
+    epoch seconds to a UTC TIMESTAMP_FORMAT string; naive values are taken
+    as UTC. Raises ValueError when the value cannot be parsed.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        moment = datetime.fromtimestamp(value, timezone.utc)
+    elif isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, str):
+        text = value.strip()
+        if text.replace('.', '', 1).isdigit():
+            return to_db_timestamp(float(text))  # epoch seconds read from CSV
+        if text.endswith(('Z', 'z')):
+            text = text[:-1] + '+00:00'
+        moment = datetime.fromisoformat(text)
+    else:
+        raise ValueError(f"Unsupported timestamp: {value!r}")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+
+def save_analyses(rows):
+    """
+    Insert analysis rows in one transaction and return how many were written.
+    Each row is (user_id, feedback_text, sentiment, confidence, created_at, tier).
+    """
+    if not rows:
+        return 0
+    connection = get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.executemany("""
+            INSERT INTO user_analyses (user_id, feedback_text, sentiment, confidence, created_at, tier)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+        connection.commit()
+        return len(rows)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+# Recompute every counter in table_counts from the base tables
+COUNTER_REBUILD_STATEMENTS = [
+    "DELETE FROM table_counts",
+    """
+    INSERT INTO table_counts (counter, value)
+    SELECT 'users', COUNT(*) FROM users
+    UNION ALL SELECT 'user_analyses', COUNT(*) FROM user_analyses
+    UNION ALL SELECT 'user_sessions', COUNT(*) FROM user_sessions
+    UNION ALL SELECT 'sentiment:' || sentiment, COUNT(*) FROM user_analyses GROUP BY sentiment
+    """,
+]
+
+
+def rebuild_counters():
+    """Recompute table_counts from scratch (fixes any drift)"""
+    connection = get_db_connection()
+    try:
+        for statement in COUNTER_REBUILD_STATEMENTS:
+            connection.execute(statement)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def get_counts():
+    """Row counts and per-sentiment counts read from table_counts in O(1)"""
+    connection = get_db_connection()
+    try:
+        rows = connection.execute("SELECT counter, value FROM table_counts").fetchall()
+    finally:
+        connection.close()
+    counters = {row['counter']: row['value'] for row in rows}
+    return {
+        'users': counters.get('users', 0),
+        'analyses': counters.get('user_analyses', 0),
+        'sessions': counters.get('user_sessions', 0),
+        'sentiments': {
+            counter.split(':', 1)[1]: value
+            for counter, value in counters.items()
+            if counter.startswith('sentiment:') and value
+        }
+    }
+
+
+# Time-bucketed sentiment rollups, one table per granularity: a row per
+# (user, bucket, sentiment) plus user_id 0 for all users together. Triggers on
+# user_analyses keep them current for every writer (requests, write-behind
+# flushes, bulk ingest), so dashboards never scan the raw rows.
+ROLLUP_GLOBAL_USER = 0
+ROLLUP_GRANULARITIES = {
+    'hour': ('sentiment_rollup_hourly', '%Y-%m-%d %H:00:00'),
+    'day': ('sentiment_rollup_daily', '%Y-%m-%d 00:00:00'),
+}
+
+
+def _rollup_bucket(fmt, created_at):
+    # Rows with an unparseable created_at land in the current bucket rather than failing the insert
+    return f"COALESCE(strftime('{fmt}', {created_at}), strftime('{fmt}', 'now'))"
+
+
+def _rollup_add(table, fmt, row):
+    return "".join(f"""
+            INSERT INTO {table} (user_id, bucket, sentiment, analyses, confidence_sum, confidence_count)
+            VALUES ({user}, {_rollup_bucket(fmt, row + '.created_at')}, {row}.sentiment, 1,
+                    COALESCE({row}.confidence, 0), {row}.confidence IS NOT NULL)
+                ON CONFLICT(user_id, bucket, sentiment) DO UPDATE SET
+                    analyses = analyses + 1,
+                    confidence_sum = confidence_sum + excluded.confidence_sum,
+                    confidence_count = confidence_count + excluded.confidence_count;"""
+        for user in (f'{row}.user_id', ROLLUP_GLOBAL_USER))
+
+
+def _rollup_remove(table, fmt, row):
+    return f"""
+            UPDATE {table} SET
+                analyses = analyses - 1,
+                confidence_sum = confidence_sum - COALESCE({row}.confidence, 0),
+                confidence_count = confidence_count - ({row}.confidence IS NOT NULL)
+            WHERE user_id IN ({row}.user_id, {ROLLUP_GLOBAL_USER})
+              AND bucket = {_rollup_bucket(fmt, row + '.created_at')}
+              AND sentiment = {row}.sentiment;"""
+
+
+ROLLUP_SCHEMA_STATEMENTS = []
+ROLLUP_REBUILD_STATEMENTS = []
+for _table, _fmt in ROLLUP_GRANULARITIES.values():
+    ROLLUP_SCHEMA_STATEMENTS += [
+        f"""
+        CREATE TABLE IF NOT EXISTS {_table} (
+            user_id INTEGER NOT NULL,
+            bucket TIMESTAMP NOT NULL,
+            sentiment VARCHAR(20) NOT NULL,
+            analyses INTEGER NOT NULL DEFAULT 0,
+            confidence_sum REAL NOT NULL DEFAULT 0,
+            confidence_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, bucket, sentiment)
+        ) WITHOUT ROWID
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{_table}_insert AFTER INSERT ON user_analyses BEGIN{_rollup_add(_table, _fmt, 'NEW')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{_table}_delete AFTER DELETE ON user_analyses BEGIN{_rollup_remove(_table, _fmt, 'OLD')}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{_table}_update
+        AFTER UPDATE OF user_id, sentiment, confidence, created_at ON user_analyses BEGIN{_rollup_remove(_table, _fmt, 'OLD')}{_rollup_add(_table, _fmt, 'NEW')}
+        END
+        """,
+    ]
+    # Recompute the rollup from user_analyses
+    _bucket = _rollup_bucket(_fmt, 'created_at')
+    ROLLUP_REBUILD_STATEMENTS += [
+        f"DELETE FROM {_table}",
+        f"""
+        INSERT INTO {_table} (user_id, bucket, sentiment, analyses, confidence_sum, confidence_count)
+        SELECT user_id, {_bucket}, sentiment, COUNT(*), COALESCE(SUM(confidence), 0), COUNT(confidence)
+        FROM user_analyses GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT {ROLLUP_GLOBAL_USER}, {_bucket}, sentiment, COUNT(*), COALESCE(SUM(confidence), 0), COUNT(confidence)
+        FROM user_analyses GROUP BY 1, 2, 3
+        """,
+    ]
+
+
+def rebuild_rollups():
+    """Regenerate the sentiment rollups from the raw rows (fixes any drift)"""
+    connection = get_db_connection()
+    try:
+        for statement in ROLLUP_REBUILD_STATEMENTS:
+            connection.execute(statement)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def get_sentiment_rollups(granularity='day', user_id=None, date_from=None, date_to=None):
+    """
+    Sentiment counts and confidence per time bucket, for one user or (user_id
+    None) everyone. date_from/date_to are 'YYYY-MM-DD HH:MM:SS' strings; the
+    range covers buckets starting in [date_from, date_to).
+    """
+    table = ROLLUP_GRANULARITIES[granularity][0]
+    clauses = ["user_id = ?"]
+    params = [ROLLUP_GLOBAL_USER if user_id is None else user_id]
+    if date_from:
+        clauses.append("bucket >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append("bucket < ?")
+        params.append(date_to)
+    connection = get_db_connection()
+    try:
+        rows = connection.execute(f"""
+            SELECT bucket, sentiment, analyses, confidence_sum, confidence_count
+            FROM {table}
+            WHERE {' AND '.join(clauses)} AND analyses > 0
+            ORDER BY bucket
+        """, params).fetchall()
+    finally:
+        connection.close()
+
+    buckets = []
+    for row in rows:
+        if not buckets or buckets[-1]['bucket'] != row['bucket']:
+            buckets.append({'bucket': row['bucket'], 'analyses': 0, 'sentiments': {},
+                            'confidence_sum': 0.0, 'confidence_count': 0})
+        bucket = buckets[-1]
+        bucket['analyses'] += row['analyses']
+        bucket['sentiments'][row['sentiment']] = row['analyses']
+        bucket['confidence_sum'] += row['confidence_sum']
+        bucket['confidence_count'] += row['confidence_count']
+    for bucket in buckets:
+        confidence_sum = bucket.pop('confidence_sum')
+        confidence_count = bucket.pop('confidence_count')
+        bucket['avg_confidence'] = round(confidence_sum / confidence_count, 4) if confidence_count else None
+    return buckets
+
+
+# Versioned schema changes, applied in order on top of the base tables.
+# Each entry is (version, description, statements); never edit a released one,
+# append a new version instead. Migrations only add objects, never rebuild tables.
+MIGRATIONS = [
+    (1, 'secondary indexes for listing and per-user lookups', [
+        "CREATE INDEX IF NOT EXISTS idx_user_analyses_user_created ON user_analyses (user_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_user_analyses_sentiment_created ON user_analyses (sentiment, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_user_analyses_created ON user_analyses (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_user_sessions_expires_at ON user_sessions (expires_at)",
+        "CREATE INDEX IF NOT EXISTS idx_user_sessions_user_id ON user_sessions (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_users_provider ON users (provider, provider_id)",
+        "CREATE INDEX IF NOT EXISTS idx_users_created ON users (created_at, id)",
+    ]),
+    (2, 'keyset pagination index for sessions', [
+        "CREATE INDEX IF NOT EXISTS idx_user_sessions_created ON user_sessions (created_at, id)",
+    ]),
+    (3, 'trigger-maintained row and sentiment counters', [
+        """
+        CREATE TABLE IF NOT EXISTS table_counts (
+            counter VARCHAR(64) PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_users_count_insert AFTER INSERT ON users BEGIN
+            UPDATE table_counts SET value = value + 1 WHERE counter = 'users';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_users_count_delete AFTER DELETE ON users BEGIN
+            UPDATE table_counts SET value = value - 1 WHERE counter = 'users';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sessions_count_insert AFTER INSERT ON user_sessions BEGIN
+            UPDATE table_counts SET value = value + 1 WHERE counter = 'user_sessions';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sessions_count_delete AFTER DELETE ON user_sessions BEGIN
+            UPDATE table_counts SET value = value - 1 WHERE counter = 'user_sessions';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_analyses_count_insert AFTER INSERT ON user_analyses BEGIN
+            UPDATE table_counts SET value = value + 1 WHERE counter = 'user_analyses';
+            INSERT INTO table_counts (counter, value) VALUES ('sentiment:' || NEW.sentiment, 1)
+                ON CONFLICT(counter) DO UPDATE SET value = value + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_analyses_count_delete AFTER DELETE ON user_analyses BEGIN
+            UPDATE table_counts SET value = value - 1 WHERE counter = 'user_analyses';
+            UPDATE table_counts SET value = value - 1 WHERE counter = 'sentiment:' || OLD.sentiment;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_analyses_count_update AFTER UPDATE OF sentiment ON user_analyses
+        WHEN OLD.sentiment IS NOT NEW.sentiment BEGIN
+            UPDATE table_counts SET value = value - 1 WHERE counter = 'sentiment:' || OLD.sentiment;
+            INSERT INTO table_counts (counter, value) VALUES ('sentiment:' || NEW.sentiment, 1)
+                ON CONFLICT(counter) DO UPDATE SET value = value + 1;
+        END
+        """,
+    ] + COUNTER_REBUILD_STATEMENTS),
+    (4, 'record which analyzer tier produced each analysis', [
+        "ALTER TABLE user_analyses ADD COLUMN tier VARCHAR(20) DEFAULT NULL",
+    ]),
+    (5, 'server-side session revocation', [
+        "ALTER TABLE user_sessions ADD COLUMN revoked_at TIMESTAMP DEFAULT NULL",
+        "CREATE INDEX IF NOT EXISTS idx_user_sessions_token_hash ON user_sessions (token_hash)",
+        "CREATE INDEX IF NOT EXISTS idx_user_sessions_revoked_at ON user_sessions (revoked_at)",
+    ]),
+    (6, 'hourly and daily sentiment rollups', ROLLUP_SCHEMA_STATEMENTS + ROLLUP_REBUILD_STATEMENTS),
+    (7, 'revocation log read by session sync', [
+        # Ids are handed out under SQLite's single write lock, so they follow
+        # commit order; a sync watermark on them cannot skip a late commit
+        """
+        CREATE TABLE IF NOT EXISTS session_revocations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token_hash VARCHAR(64) NOT NULL,
+            expires_at TIMESTAMP NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_session_revocations_expires_at ON session_revocations (expires_at)",
+        """
+        INSERT INTO session_revocations (token_hash, expires_at)
+        SELECT token_hash, expires_at FROM user_sessions WHERE revoked_at IS NOT NULL
+        """,
+    ]),
+]
+
+
+def get_schema_version(connection):
+    """Highest applied migration version (0 for a fresh database)"""
+    row = connection.execute("SELECT MAX(version) FROM schema_migrations").fetchone()
+    return row[0] or 0
+
+
+def run_migrations():
+    """
+    Apply pending migrations in order; safe to call on every startup, from
+    several processes at once. Each migration runs in its own BEGIN IMMEDIATE
+    transaction on a dedicated autocommit connection (the pooled connections'
+    legacy transaction handling commits DDL immediately), so a failure rolls
+    back all of its statements and concurrent workers apply it exactly once.
+    """
+    connection = sqlite3.connect(DB_PATH, timeout=MIGRATION_LOCK_TIMEOUT_SECONDS, isolation_level=None)
+    try:
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        current = get_schema_version(connection)
+        applied = []
+        for version, description, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have applied it while we waited for the write lock
+                current = get_schema_version(connection)
+                if version <= current:
+                    connection.execute("COMMIT")
+                    continue
+                for statement in statements:
+                    connection.execute(statement)
+                connection.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (?, ?)",
+                    (version, description)
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            current = version
+            applied.append(version)
+            print(f"Applied migration {version}: {description}")
+        if applied:
+            # Refresh planner statistics so the new indexes get used
+            connection.execute("ANALYZE")
+        return applied
+    finally:
+        connection.close()
+
+
 def init_db():
     """Initialize the database with required tables"""
     connection = get_db_connection()
@@ -62,9 +628,28 @@ def init_db():
         """)
         
         connection.commit()
+        run_migrations()
         print("Database initialized successfully")
     except Exception as e:
         print(f"Error initializing database: {e}")
         raise
     finally:
-        connection.close()
\ No newline at end of file
+        connection.close()
+
+
+if __name__ == '__main__':
+    import sys
+    command = sys.argv[1] if len(sys.argv) > 1 else 'init'
+    if command == 'init':
+        init_db()
+    elif command == 'rebuild-counters':
+        init_db()
+        rebuild_counters()
+        print(f"Counters rebuilt: {get_counts()}")
+    elif command == 'rebuild-rollups':
+        init_db()
+        rebuild_rollups()
+        print(f"Rollups rebuilt: {len(get_sentiment_rollups('day'))} daily buckets")
+    else:
+        print("Usage: python database_sqlite.py [init|rebuild-counters|rebuild-rollups]")
+        sys.exit(1)
@@ -0,0 +1,128 @@
+"""
+Google ID token verification with cached signing certificates.
+
+Google's certificate endpoint answers with Cache-Control: max-age, so
+CachingRequest keeps each certificate response until it expires and a login
+normally makes no outbound request. Tokens that already passed verification
+are cached briefly by token hash (never past their own exp).
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+
+import requests
+from google.auth import transport
+from google.auth.transport.requests import Request
+from google.oauth2 import id_token
+
+from ttl_cache import TTLCache
+
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/oauth2/v1/certs'
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+GOOGLE_CLIENT_ID = os.getenv(
+    'GOOGLE_CLIENT_ID',
+    '1058789935119-ir2vemi3kdutvsu9mgsar8i2qccsqooi.apps.googleusercontent.com'
+)
+GOOGLE_TOKEN_CACHE_SIZE = int(os.getenv('GOOGLE_TOKEN_CACHE_SIZE', 10000))
+GOOGLE_TOKEN_CACHE_TTL = int(os.getenv('GOOGLE_TOKEN_CACHE_TTL', 60))
+
+_MAX_AGE = re.compile(r'max-age\s*=\s*(\d+)')
+
+
+def cache_lifetime(headers):
+    """Seconds a response may be reused according to Cache-Control (and Age)"""
+    cache_control = (headers.get('Cache-Control') or '').lower()
+    if 'no-store' in cache_control or 'no-cache' in cache_control:
+        return 0
+    match = _MAX_AGE.search(cache_control)
+    if not match:
+        return 0
+    try:
+        age = int(headers.get('Age') or 0)
+    except ValueError:
+        age = 0
+    return max(0, int(match.group(1)) - age)
+
+
+class CachingRequest(transport.Request):
+    """
+    google.auth transport that reuses one HTTP session and serves repeated
+    GETs from memory for as long as the response's Cache-Control allows
+    """
+
+    def __init__(self, session=None):
+        self._request = Request(session=session or requests.Session())
+        self._cache = {}  # url -> (expires_at, response)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'fetches': 0}
+
+    def __call__(self, url, method='GET', body=None, headers=None, timeout=None, **kwargs):
+        if method.upper() != 'GET' or body is not None:
+            return self._request(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(url)
+            if cached is not None and cached[0] > now:
+                self._stats['hits'] += 1
+                return cached[1]
+
+        response = self._request(url, method='GET', headers=headers, timeout=timeout, **kwargs)
+        lifetime = cache_lifetime(response.headers) if response.status == 200 else 0
+        with self._lock:
+            self._stats['fetches'] += 1
+            if lifetime:
+                self._cache[url] = (now + lifetime, response)
+            else:
+                self._cache.pop(url, None)
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, cached_urls=len(self._cache))
+
+
+_transport = CachingRequest()
+_verified_tokens = TTLCache(GOOGLE_TOKEN_CACHE_SIZE, GOOGLE_TOKEN_CACHE_TTL)
+
+
+def verify_google_id_token(token, client_id=None, certs_url=GOOGLE_CERTS_URL, request=None):
+    """
+    Verify a Google ID token (signature, audience, expiry and issuer) and
+    return its claims. Raises ValueError for an invalid token.
+    """
+    audience = client_id or GOOGLE_CLIENT_ID
+    key = hashlib.sha256(f"{audience}|{certs_url}|{token}".encode('utf-8')).hexdigest()
+    idinfo = _verified_tokens.get(key)
+    if idinfo is not None and idinfo['exp'] > time.time():
+        return dict(idinfo)
+
+    idinfo = id_token.verify_token(
+        token, request or _transport, audience=audience, certs_url=certs_url
+    )
+    if idinfo.get('iss') not in GOOGLE_ISSUERS:
+        raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+
+    ttl = min(GOOGLE_TOKEN_CACHE_TTL, idinfo['exp'] - time.time())
+    if ttl > 0:
+        _verified_tokens.set(key, idinfo, ttl=ttl)
+    return dict(idinfo)
+
+
+def clear_caches():
+    _transport.clear()
+    _verified_tokens.clear()
+
+
+def get_google_cache_stats():
+    """Certificate transport and verified-token cache counters"""
+    return {
+        'certs': _transport.stats(),
+        'verified_tokens': _verified_tokens.stats()
+    }
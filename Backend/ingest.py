@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Bulk-ingest historical feedback into user_analyses.
+
+Streams a CSV or JSONL file (optionally .gz) without loading it into memory,
+analyzes chunks of rows on a process pool running the configured analyzer
+backend, and writes each chunk in one transaction. Progress is checkpointed
+after every committed chunk, so an interrupted run resumes where it stopped.
+
+    python ingest.py feedback.csv.gz --user-id 1
+    python ingest.py export.jsonl --user-column user_id --workers 8 --resume
+"""
+import argparse
+import csv
+import gzip
+import importlib
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from database_sqlite import init_db, save_analyses, to_db_timestamp
+
+_analyzer = None
+
+
+def _init_worker(backend):
+    """Load the analyzer once per worker process"""
+    global _analyzer
+    _analyzer = importlib.import_module(backend)
+
+
+def _analyze_chunk(texts):
+    return _analyzer.analyze_feedback_batch(texts, generate_reply=False)
+
+
+def open_input(path):
+    """Open a text file for streaming, transparently un-gzipping *.gz"""
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def iter_records(path):
+    """
+    Yield one dict per input row from a CSV or JSONL file. A JSONL line that
+    does not parse yields None (and is reported with its line number), so one
+    corrupt line is skipped instead of aborting the run.
+    """
+    name = path[:-3] if path.endswith('.gz') else path
+    with open_input(path) as f:
+        if name.endswith(('.jsonl', '.ndjson')):
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"Skipping line {line_number} of {path}: {e}", file=sys.stderr)
+                    yield None
+        else:
+            yield from csv.DictReader(f)
+
+
+def feedback_text(record, column):
+    """The text to analyze, or '' for corrupt records and missing or blank text"""
+    if not isinstance(record, dict):
+        return ''
+    text = record.get(column)
+    return str(text) if text is not None and str(text).strip() else ''
+
+
+def iter_chunks(records, size, skip=0):
+    """Group records into lists of `size`, skipping the first `skip` records"""
+    chunk = []
+    for index, record in enumerate(records):
+        if index < skip:
+            continue
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_checkpoint(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f).get('rows_done', 0)
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path, source, rows_done):
+    """Atomically record how many input rows are safely committed"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'source': os.path.abspath(source), 'rows_done': rows_done}, f)
+    os.replace(tmp_path, path)
+
+
+def build_rows(chunk, results, args, backend, now):
+    """
+    Turn analyzed records into save_analyses() rows; returns (rows, skipped).
+    Rows with a failed analysis, a missing or non-numeric user id or an
+    unparseable created_at are skipped rather than aborting the run.
+    """
+    rows = []
+    skipped = 0
+    for record, result in zip(chunk, results):
+        user_id = record.get(args.user_column) if args.user_column else args.user_id
+        if 'error' in result or not user_id:
+            skipped += 1
+            continue
+        created_at = (args.created_column and record.get(args.created_column)) or None
+        try:
+            user_id = int(user_id)
+            # Stored as UTC '%Y-%m-%d %H:%M:%S' so it sorts and filters like app-written rows
+            created_at = to_db_timestamp(created_at) if created_at is not None else now
+        except (TypeError, ValueError):
+            skipped += 1
+            continue
+        rows.append((
+            user_id, result['feedback'], result['sentiment'], result.get('confidence'),
+            created_at, result.get('tier', backend)
+        ))
+    return rows, skipped
+
+
+def ingest(args):
+    backend = args.backend
+    checkpoint = args.checkpoint or f"{args.input}.checkpoint.json"
+    start = read_checkpoint(checkpoint) if args.resume else 0
+    if start:
+        print(f"Resuming after {start} rows (checkpoint {checkpoint})")
+    init_db()
+
+    records = iter_records(args.input)
+    chunks = iter_chunks(records, args.chunk_size, skip=start)
+    rows_done = start
+    written = skipped = 0
+    started = last_report = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(backend,)) as pool:
+        pending = deque()
+
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            # Corrupt lines and rows without text are counted, never analyzed
+            analyzable = [record for record in chunk if feedback_text(record, args.text_column)]
+            texts = [feedback_text(record, args.text_column) for record in analyzable]
+            if texts:
+                future = pool.submit(_analyze_chunk, texts)
+            else:
+                future = Future()
+                future.set_result([])
+            pending.append((chunk, analyzable, future))
+            return True
+
+        # Keep a bounded number of chunks in flight so memory stays flat
+        for _ in range(args.workers * 2):
+            if not submit_next():
+                break
+        while pending:
+            chunk, analyzable, future = pending.popleft()
+            results = future.result()
+            submit_next()
+
+            now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+            rows, chunk_skipped = build_rows(analyzable, results, args, backend, now)
+            chunk_skipped += len(chunk) - len(analyzable)
+            try:
+                written += save_analyses(rows)
+            except sqlite3.IntegrityError:
+                # e.g. a user id with no users row: keep the rest of the chunk
+                for row in rows:
+                    try:
+                        written += save_analyses([row])
+                    except sqlite3.IntegrityError:
+                        chunk_skipped += 1
+            skipped += chunk_skipped
+            rows_done += len(chunk)
+            write_checkpoint(checkpoint, args.input, rows_done)
+
+            elapsed = time.perf_counter() - started
+            if time.perf_counter() - last_report >= args.progress_every:
+                last_report = time.perf_counter()
+                rate = (rows_done - start) / elapsed if elapsed else 0
+                print(f"  {rows_done} rows read, {written} written, {skipped} skipped ({rate:,.0f} rows/sec)",
+                      file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    processed = rows_done - start
+    rate = processed / elapsed if elapsed else 0
+    print(f"Ingested {written} analyses from {processed} rows "
+          f"({skipped} skipped) in {elapsed:.1f}s: {rate:,.0f} rows/sec")
+    return {'rows': processed, 'written': written, 'skipped': skipped,
+            'seconds': round(elapsed, 3), 'rows_per_sec': round(rate, 1)}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk-ingest feedback from CSV/JSONL (optionally .gz)')
+    parser.add_argument('input', help='CSV or JSONL file, optionally gzipped')
+    parser.add_argument('--text-column', default='text', help="column/key holding the feedback (default: text)")
+    owner = parser.add_mutually_exclusive_group(required=True)
+    owner.add_argument('--user-id', type=int, help='store every row for this user id')
+    owner.add_argument('--user-column', help='column/key holding the user id')
+    parser.add_argument('--created-column',
+                        help='column/key holding created_at as ISO 8601 (offsets are converted to UTC) '
+                             'or epoch seconds (default: ingest time)')
+    parser.add_argument('--backend', default=os.getenv('ANALYZER_BACKEND', 'llm_mock'),
+                        help='analyzer module (default: ANALYZER_BACKEND or llm_mock)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=5000, help='rows per analysis task and DB transaction')
+    parser.add_argument('--checkpoint', help='checkpoint file (default: <input>.checkpoint.json)')
+    parser.add_argument('--resume', action='store_true', help='skip rows recorded in the checkpoint')
+    parser.add_argument('--progress-every', type=float, default=5.0, help='seconds between progress lines')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    load_dotenv()
+    ingest(parse_args())
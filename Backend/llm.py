@@ -1,55 +1,171 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser, PydanticOutputParser
-from langchain_core.runnables import RunnableBranch, RunnableLambda
 from pydantic import BaseModel, Field
 from typing import Literal
-from dotenv import load_dotenv
-load_dotenv()
+import asyncio
+import os
+import threading
 
-model = ChatOpenAI(model="gpt-5-mini",temperature=1)
-parser = StrOutputParser()
+LLM_MODEL = os.getenv('LLM_MODEL', 'gpt-5-mini')
+# Async path: how many model calls may be in flight at once, and per-call timeout
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 8))
+LLM_CALL_TIMEOUT = float(os.getenv('LLM_CALL_TIMEOUT', 60))
 
 class Feedback(BaseModel):
     sentiment: Literal['positive', 'negative', 'neutral'] = Field(description="give the sentiment of the feedback")
 
-parser2 = PydanticOutputParser(pydantic_object=Feedback)
-
-prompt1 = PromptTemplate(
-    template='classify the following feedback into positive , negative , neutral {text} \n {format_instruction}',
-    input_variables=["text"],
-    partial_variables={'format_instruction': parser2.get_format_instructions()}
-)
-
-classifier_chain = prompt1 | model | parser2
-prompt2 = PromptTemplate(
-    template="Write an appropriate response for this positive feedback \n {text}",
-    input_variables=["text"]
-)
-prompt3 = PromptTemplate(
-    template="Write an appropriate response for this negative feedback \n {text}",
-    input_variables=["text"]
-)
-
-branch_chain = RunnableBranch(
-    (lambda x: x.sentiment == 'positive', prompt2 | model | parser),
-    (lambda x: x.sentiment == 'negative', prompt3 | model | parser),
-    RunnableLambda(lambda x: "could not find sentiment")
-)
-chain = classifier_chain | branch_chain
-
-
-def analyze_feedback(text: str):
-    """Classify feedback text and optionally return model response."""
-    classification = classifier_chain.invoke({'text': text})
-    # Currently we only need sentiment for API response; feel free to return `result`
-    _ = chain.invoke({'text': text})
+# The chat model and chains are built on first use (or by warm_up()), so
+# importing this module does not pay for langchain/openai or the client.
+model = classifier_chain = branch_chain = chain = None
+_chains_lock = threading.RLock()
+
+# Sync callers submit to one long-lived event loop: the OpenAI client pools
+# its async connections process-wide, bound to the loop that opened them, so
+# a fresh asyncio.run() per call would find them tied to a closed loop.
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def build_chains(chat_model):
+    """Build (classifier_chain, branch_chain, chain) around a chat model"""
+    from langchain_core.prompts import PromptTemplate
+    from langchain_core.output_parsers import StrOutputParser, PydanticOutputParser
+    from langchain_core.runnables import RunnableBranch, RunnableLambda, RunnablePassthrough
+
+    parser = StrOutputParser()
+    parser2 = PydanticOutputParser(pydantic_object=Feedback)
+
+    prompt1 = PromptTemplate(
+        template='classify the following feedback into positive , negative , neutral {text} \n {format_instruction}',
+        input_variables=["text"],
+        partial_variables={'format_instruction': parser2.get_format_instructions()}
+    )
+
+    prompt2 = PromptTemplate(
+        template="Write an appropriate response for this positive feedback \n {text}",
+        input_variables=["text"]
+    )
+    prompt3 = PromptTemplate(
+        template="Write an appropriate response for this negative feedback \n {text}",
+        input_variables=["text"]
+    )
+
+    classifier_chain = prompt1 | chat_model | parser2
+    branch_chain = RunnableBranch(
+        (lambda x: x['classification'].sentiment == 'positive', prompt2 | chat_model | parser),
+        (lambda x: x['classification'].sentiment == 'negative', prompt3 | chat_model | parser),
+        RunnableLambda(lambda x: "could not find sentiment")
+    )
+    # Classify once, then hand the same classification to the reply branch:
+    # {'text'} -> {'text', 'classification'} -> {'text', 'classification', 'reply'}
+    chain = (
+        RunnablePassthrough.assign(classification=classifier_chain)
+        | RunnablePassthrough.assign(reply=branch_chain)
+    )
+    return classifier_chain, branch_chain, chain
+
+
+def set_model(chat_model):
+    """Swap the chat model used by every chain (e.g. a fake model in tests)"""
+    global model, classifier_chain, branch_chain, chain
+    with _chains_lock:
+        model = chat_model
+        classifier_chain, branch_chain, chain = build_chains(chat_model)
+
+
+def get_chains():
+    """(classifier_chain, chain), creating the OpenAI chat model on first call"""
+    if chain is None:
+        with _chains_lock:
+            if chain is None:
+                from langchain_openai import ChatOpenAI
+                set_model(ChatOpenAI(model=LLM_MODEL, temperature=1))
+    return classifier_chain, chain
+
+
+def warm_up():
+    """Import langchain/openai and build the chains before serving requests"""
+    get_chains()
+
+
+def get_model_version():
+    """Identifies the chat model (used in analysis cache keys)"""
+    return LLM_MODEL
+
+
+def _to_result(text, output):
+    """Turn a classifier or full-chain output into the API result dict"""
+    if isinstance(output, Feedback):
+        return {'feedback': text, 'sentiment': output.sentiment}
     return {
         'feedback': text,
-        'sentiment': classification.sentiment
+        'sentiment': output['classification'].sentiment,
+        'reply': output['reply']
     }
 
 
+def analyze_feedback(text: str, generate_reply: bool = True):
+    """Classify feedback text and, unless disabled, generate a reply to it."""
+    classifier, full_chain = get_chains()
+    runnable = full_chain if generate_reply else classifier
+    return _to_result(text, runnable.invoke({'text': text}))
+
+
+def get_event_loop():
+    """The background event loop that runs the async path for sync callers"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='llm-event-loop', daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def analyze_feedback_batch(texts: list, generate_reply: bool = True):
+    """Analyze many feedback texts concurrently (bounded), in input order."""
+    future = asyncio.run_coroutine_threadsafe(
+        analyze_feedback_batch_async(texts, generate_reply), get_event_loop()
+    )
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+async def analyze_feedback_async(text: str, generate_reply: bool = True, timeout: float = None):
+    """Async analyze_feedback(); raises asyncio.TimeoutError after `timeout` seconds."""
+    classifier, full_chain = get_chains()
+    runnable = full_chain if generate_reply else classifier
+    output = await asyncio.wait_for(
+        runnable.ainvoke({'text': text}), timeout or LLM_CALL_TIMEOUT
+    )
+    return _to_result(text, output)
+
+
+async def analyze_feedback_batch_async(texts: list, generate_reply: bool = True,
+                                       max_concurrency: int = None, timeout: float = None):
+    """
+    Fan texts out as concurrent model calls, at most `max_concurrency` at a
+    time, each bounded by `timeout`. Results are in input order; failed or
+    timed-out items carry an 'error' key. Cancelling the caller cancels every
+    in-flight call.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or LLM_MAX_CONCURRENCY)
+    timeout = timeout or LLM_CALL_TIMEOUT
+
+    async def run_one(text):
+        async with semaphore:
+            try:
+                return await analyze_feedback_async(text, generate_reply, timeout)
+            except asyncio.TimeoutError:
+                return {'feedback': text, 'error': f'Model call timed out after {timeout}s'}
+            except Exception as e:
+                return {'feedback': text, 'error': str(e)}
+
+    return list(await asyncio.gather(*(run_one(text) for text in texts)))
+
+
 # if __name__ == "__main__":
 #     # Simple CLI loop for manual testing
 #     while True:
@@ -0,0 +1,93 @@
+"""
+Confidence-based cascade: a cheap local classifier answers first and only
+uncertain texts (confidence below CASCADE_THRESHOLD) are escalated to the
+LLM chain in llm.py. Same analyze_feedback contract as the other backends;
+every result carries a 'tier' naming the backend that answered.
+"""
+import importlib
+import os
+import threading
+from typing import Any, Dict, List
+
+CASCADE_FAST_BACKEND = os.getenv('CASCADE_FAST_BACKEND', 'llm_mock')
+CASCADE_THRESHOLD = float(os.getenv('CASCADE_THRESHOLD', 0.7))
+
+fast = importlib.import_module(CASCADE_FAST_BACKEND)
+_llm = None
+_llm_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {'analyzed': 0, 'escalated': 0, 'escalation_errors': 0}
+
+
+def get_llm():
+    """Import llm.py (and build its chains) on first escalation only"""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = importlib.import_module('llm')
+    return _llm
+
+
+def get_model_version() -> str:
+    """Both tiers and the threshold decide the result, so all go into the cache key"""
+    return f"{CASCADE_FAST_BACKEND}:{fast.get_model_version()}|llm:{get_llm().get_model_version()}|t={CASCADE_THRESHOLD}"
+
+
+def reload_model():
+    reload_fast = getattr(fast, 'reload_model', None)
+    if reload_fast:
+        reload_fast()
+
+
+def warm_up():
+    """Prepare both tiers so the first escalation does not pay for importing llm.py"""
+    warm_fast = getattr(fast, 'warm_up', None)
+    if warm_fast:
+        warm_fast()
+    get_llm().warm_up()
+
+
+def needs_escalation(result: Dict[str, Any]) -> bool:
+    if 'error' in result:
+        return True
+    confidence = result.get('confidence')
+    return confidence is None or confidence < CASCADE_THRESHOLD
+
+
+def analyze_feedback(text: str, generate_reply: bool = True) -> Dict[str, Any]:
+    """Analyze one text; replies are only generated when the LLM tier answers"""
+    return analyze_feedback_batch([text], generate_reply)[0]
+
+
+def analyze_feedback_batch(texts: List[str], generate_reply: bool = True) -> List[Dict[str, Any]]:
+    """Run the fast tier on everything, then one LLM batch for the uncertain items"""
+    results = [dict(result, tier=CASCADE_FAST_BACKEND) for result in fast.analyze_feedback_batch(texts)]
+    uncertain = [index for index, result in enumerate(results) if needs_escalation(result)]
+    errors = 0
+    if uncertain:
+        escalated = get_llm().analyze_feedback_batch(
+            [texts[i] for i in uncertain], generate_reply=generate_reply
+        )
+        for index, result in zip(uncertain, escalated):
+            if 'error' in result:
+                # Keep the fast answer rather than failing the item
+                errors += 1
+                results[index]['escalation_error'] = result['error']
+            else:
+                results[index] = dict(result, tier='llm', confidence=None)
+    with _stats_lock:
+        _stats['analyzed'] += len(texts)
+        _stats['escalated'] += len(uncertain)
+        _stats['escalation_errors'] += errors
+    return results
+
+
+def get_stats() -> Dict[str, Any]:
+    """Escalation counters for monitoring"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['threshold'] = CASCADE_THRESHOLD
+    stats['fast_backend'] = CASCADE_FAST_BACKEND
+    stats['escalation_rate'] = round(stats['escalated'] / stats['analyzed'], 4) if stats['analyzed'] else 0.0
+    return stats
@@ -0,0 +1,51 @@
+"""
+Fake chat model for exercising llm.py without OpenAI (tests and benchmark.py).
+
+Answers the classifier prompt with a keyword guess ('love' -> positive,
+'hate' -> negative, otherwise neutral) and every reply prompt with a fixed
+text, after a simulated latency. Counts calls and peak async concurrency.
+"""
+import asyncio
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class SlowFakeChatModel(BaseChatModel):
+    """Answers like the real prompts expect, after `latency` seconds"""
+
+    latency: float = 0.05
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    calls: int = 0
+
+    @property
+    def _llm_type(self):
+        return 'slow-fake'
+
+    def _answer(self, messages):
+        prompt = messages[-1].content
+        if prompt.startswith('classify'):
+            text = prompt.lower()
+            sentiment = 'positive' if 'love' in text else 'negative' if 'hate' in text else 'neutral'
+            content = '{"sentiment": "%s"}' % sentiment
+        else:
+            content = 'Thanks for the feedback!'
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._answer(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        return self._answer(messages)
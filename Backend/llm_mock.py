@@ -1,13 +1,98 @@
 """
 Simple mock LLM for feedback analysis without OpenAI dependency
 """
+import hashlib
+import json
+import os
 import re
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-def analyze_feedback(text: str) -> Dict[str, Any]:
+# Default lexicon; every term has weight 1.0
+DEFAULT_POSITIVE_WORDS = [
+    'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic',
+    'love', 'perfect', 'awesome', 'brilliant', 'outstanding', 'superb',
+    'happy', 'satisfied', 'pleased', 'delighted', 'impressed', 'recommend'
+]
+
+DEFAULT_NEGATIVE_WORDS = [
+    'bad', 'terrible', 'awful', 'horrible', 'disgusting', 'hate',
+    'worst', 'disappointing', 'frustrated', 'angry', 'annoyed', 'upset',
+    'useless', 'broken', 'failed', 'poor', 'slow', 'expensive'
+]
+
+_TOKEN_RE = re.compile(r'\b\w+\b')
+
+
+class Lexicon:
+    """Compiled lexicon: one dict lookup per token, built once and shared"""
+
+    def __init__(self, positive, negative):
+        # token -> signed weight (positive terms > 0, negative terms < 0)
+        self.weights = {}
+        for term, weight in _as_weights(negative).items():
+            self.weights[term] = -abs(weight)
+        for term, weight in _as_weights(positive).items():
+            self.weights[term] = abs(weight)
+        digest = hashlib.sha1(
+            json.dumps(sorted(self.weights.items())).encode('utf-8')
+        ).hexdigest()
+        self.version = digest[:12]
+
+    def __len__(self):
+        return len(self.weights)
+
+
+def _as_weights(terms) -> Dict[str, float]:
+    """Accept either a list of terms or a {term: weight} mapping"""
+    if isinstance(terms, dict):
+        return {str(term).lower(): float(weight) for term, weight in terms.items()}
+    return {str(term).lower(): 1.0 for term in terms}
+
+
+def load_lexicon(path: Optional[str] = None) -> Lexicon:
+    """
+    Build a lexicon from a JSON file of the form
+    {"positive": [...] or {term: weight}, "negative": [...] or {term: weight}}.
+    Falls back to the built-in word lists when no file is configured.
+    """
+    path = path or os.getenv('LEXICON_PATH')
+    if not path:
+        return Lexicon(DEFAULT_POSITIVE_WORDS, DEFAULT_NEGATIVE_WORDS)
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return Lexicon(data.get('positive', []), data.get('negative', []))
+
+
+_lexicon = load_lexicon()
+
+
+def reload_lexicon(path: Optional[str] = None) -> Lexicon:
+    """Rebuild the lexicon (e.g. after editing LEXICON_PATH) and swap it in"""
+    global _lexicon
+    _lexicon = load_lexicon(path)
+    return _lexicon
+
+
+def get_lexicon() -> Lexicon:
+    """Return the lexicon currently used by analyze_feedback"""
+    return _lexicon
+
+
+def get_model_version() -> str:
+    """Identifies the active lexicon (used in analysis cache keys)"""
+    return _lexicon.version
+
+
+def reload_model():
+    """Backend-neutral name for reload_lexicon()"""
+    return reload_lexicon()
+
+
+def analyze_feedback(text: str, generate_reply: bool = True) -> Dict[str, Any]:
     """
     Analyze feedback text and return sentiment analysis
-    This is a mock implementation that doesn't require OpenAI
+    This is a mock implementation that doesn't require OpenAI;
+    generate_reply is accepted for parity with llm.py but no reply is produced
     """
     if not text or not text.strip():
         return {
@@ -17,47 +102,53 @@ def analyze_feedback(text: str) -> Dict[str, Any]:
             'keywords': [],
             'message': 'No text provided'
         }
-    
-    # Simple rule-based sentiment analysis
-    text_lower = text.lower().strip()
-    
-    # Positive keywords
-    positive_words = [
-        'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 
-        'love', 'perfect', 'awesome', 'brilliant', 'outstanding', 'superb',
-        'happy', 'satisfied', 'pleased', 'delighted', 'impressed', 'recommend'
-    ]
-    
-    # Negative keywords  
-    negative_words = [
-        'bad', 'terrible', 'awful', 'horrible', 'disgusting', 'hate',
-        'worst', 'disappointing', 'frustrated', 'angry', 'annoyed', 'upset',
-        'useless', 'broken', 'failed', 'poor', 'slow', 'expensive'
-    ]
-    
-    # Count positive and negative words
-    positive_count = sum(1 for word in positive_words if word in text_lower)
-    negative_count = sum(1 for word in negative_words if word in text_lower)
-    
+
+    # Single pass over the tokens: score and collect keywords together
+    weights = _lexicon.weights
+    matched = {}
+    keywords = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        weight = weights.get(token)
+        if weight is not None:
+            matched[token] = weight
+        if len(keywords) < 5 and len(token) > 3:
+            keywords.append(token)  # First 5 meaningful words
+
+    positive_count = sum(1 for weight in matched.values() if weight > 0)
+    negative_count = len(matched) - positive_count
+    positive_score = sum(weight for weight in matched.values() if weight > 0)
+    negative_score = -sum(weight for weight in matched.values() if weight < 0)
+
     # Determine sentiment
-    if positive_count > negative_count:
+    if positive_score > negative_score:
         sentiment = 'positive'
-        confidence = min(0.9, 0.6 + (positive_count * 0.1))
-    elif negative_count > positive_count:
-        sentiment = 'negative' 
-        confidence = min(0.9, 0.6 + (negative_count * 0.1))
+        confidence = min(0.9, 0.6 + (positive_score * 0.1))
+    elif negative_score > positive_score:
+        sentiment = 'negative'
+        confidence = min(0.9, 0.6 + (negative_score * 0.1))
     else:
         sentiment = 'neutral'
         confidence = 0.5
-    
-    # Extract keywords (simple word extraction)
-    words = re.findall(r'\b\w+\b', text_lower)
-    keywords = [word for word in words if len(word) > 3][:5]  # First 5 meaningful words
-    
+
     return {
         'feedback': text,
         'sentiment': sentiment,
         'confidence': round(confidence, 2),
         'keywords': keywords,
         'message': f'Mock analysis - detected {sentiment} sentiment with {positive_count} positive and {negative_count} negative indicators.'
-    }
\ No newline at end of file
+    }
+
+
+def analyze_feedback_batch(texts: List[str], generate_reply: bool = True) -> List[Dict[str, Any]]:
+    """
+    Analyze a list of feedback texts in one call.
+    Results come back in input order; an item that fails to analyze gets an
+    'error' key instead of aborting the rest of the batch.
+    """
+    results = []
+    for text in texts:
+        try:
+            results.append(analyze_feedback(text, generate_reply))
+        except Exception as e:
+            results.append({'feedback': text, 'error': str(e)})
+    return results
@@ -0,0 +1,122 @@
+"""
+Local scikit-learn sentiment backend for CPU-only deployments.
+
+Same analyze_feedback contract as llm.py / llm_mock.py. The model is a
+HashingVectorizer -> TF-IDF -> LogisticRegression pipeline trained from a
+labelled CSV (columns: text, sentiment). A stateless hashing vectorizer keeps
+every fitted parameter in numpy arrays, so the saved model can be loaded with
+mmap_mode='r' and its pages shared read-only between worker processes.
+
+Train:  python llm_sklearn.py train feedback.csv [model_path]
+"""
+import os
+import sys
+import threading
+from typing import Any, Dict, List
+
+import joblib
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+MODEL_PATH = os.getenv(
+    'SKLEARN_MODEL_PATH',
+    os.path.join(os.path.dirname(__file__), 'models', 'sentiment.joblib')
+)
+
+_model = None
+_model_version = None
+_model_lock = threading.Lock()
+
+
+def build_pipeline():
+    return Pipeline([
+        ('hashing', HashingVectorizer(
+            n_features=2 ** 18, ngram_range=(1, 2), alternate_sign=False,
+            lowercase=True, norm=None
+        )),
+        ('tfidf', TfidfTransformer(sublinear_tf=True)),
+        ('classifier', LogisticRegression(max_iter=1000)),
+    ])
+
+
+def train_model(csv_path: str, model_path: str = None) -> Pipeline:
+    """Fit the pipeline on a labelled CSV and save it (uncompressed, so it can be mmapped)"""
+    model_path = model_path or MODEL_PATH
+    data = pd.read_csv(csv_path, usecols=['text', 'sentiment']).dropna()
+    pipeline = build_pipeline()
+    pipeline.fit(data['text'].astype(str), data['sentiment'].astype(str).str.lower())
+    os.makedirs(os.path.dirname(os.path.abspath(model_path)), exist_ok=True)
+    joblib.dump(pipeline, model_path)
+    return pipeline
+
+
+def get_model() -> Pipeline:
+    """Load the model once per process; numpy arrays are memory-mapped read-only"""
+    global _model, _model_version
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                stat = os.stat(MODEL_PATH)
+                _model = joblib.load(MODEL_PATH, mmap_mode='r')
+                _model_version = f"{int(stat.st_mtime)}-{stat.st_size}"
+    return _model
+
+
+def reload_model():
+    """Drop the loaded model so the next call picks up a retrained file"""
+    global _model, _model_version
+    with _model_lock:
+        _model = None
+        _model_version = None
+    return get_model()
+
+
+def warm_up():
+    """Load (mmap) the model before serving requests"""
+    get_model()
+
+
+def get_model_version() -> str:
+    """Identifies the loaded model file (used in analysis cache keys)"""
+    get_model()
+    return _model_version
+
+
+def _to_result(text, probabilities, classes):
+    best = probabilities.argmax()
+    return {
+        'feedback': text,
+        'sentiment': str(classes[best]),
+        'confidence': round(float(probabilities[best]), 4),
+        'probabilities': {
+            str(label): round(float(p), 4) for label, p in zip(classes, probabilities)
+        }
+    }
+
+
+def analyze_feedback(text: str, generate_reply: bool = True) -> Dict[str, Any]:
+    """
+    Classify one feedback text with the local model.
+    generate_reply is accepted for parity with llm.py but no reply is produced
+    """
+    return analyze_feedback_batch([text], generate_reply)[0]
+
+
+def analyze_feedback_batch(texts: List[str], generate_reply: bool = True) -> List[Dict[str, Any]]:
+    """Classify many texts with one vectorized predict_proba call, in input order"""
+    if not texts:
+        return []
+    model = get_model()
+    classes = model.classes_
+    probabilities = model.predict_proba([text or '' for text in texts])
+    return [_to_result(text, row, classes) for text, row in zip(texts, probabilities)]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3 or sys.argv[1] != 'train':
+        print("Usage: python llm_sklearn.py train <labelled.csv> [model_path]")
+        sys.exit(1)
+    trained = train_model(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    print(f"Model trained on classes {list(trained.classes_)} and saved to {sys.argv[3] if len(sys.argv) > 3 else MODEL_PATH}")
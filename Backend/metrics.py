@@ -0,0 +1,175 @@
+"""
+Low-overhead request and stage latency metrics in Prometheus text format.
+
+Each thread records into its own shard (plain dicts touched only by that
+thread), so the hot path takes no locks. A scrape merges every shard; shards
+of threads that have exited are folded into a retired total, both at scrape
+time and whenever a new thread registers, so thread-per-request servers do
+not grow the registry without bound even when nothing scrapes /metrics.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+# Histogram bucket upper bounds in seconds (+Inf is implicit)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Shard:
+    """Metrics recorded by a single thread"""
+
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self.counters = {}  # (name, labels) -> value
+
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_shards = []
+_retired = _Shard()
+
+
+def _shard():
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        with _registry_lock:
+            # Registering is the only time the registry grows, so retire here
+            # too: without a scraper, finished threads must not pile up
+            _retire_finished()
+            _shards.append(shard)
+    return shard
+
+
+def _retire_finished():
+    """Fold shards of exited threads into _retired (registry lock held)"""
+    alive = []
+    for shard in _shards:
+        if shard.thread.is_alive():
+            alive.append(shard)
+        else:
+            _merge(_retired, shard)
+    _shards[:] = alive
+
+
+def observe(name, seconds, **labels):
+    """Record one observation in histogram `name`"""
+    if not METRICS_ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    histograms = _shard().histograms
+    values = histograms.get(key)
+    if values is None:
+        values = histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+    values[bisect_left(BUCKETS, seconds)] += 1
+    values[-1] += seconds
+
+
+def increment(name, amount=1, **labels):
+    """Add `amount` to counter `name`"""
+    if not METRICS_ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    counters = _shard().counters
+    counters[key] = counters.get(key, 0) + amount
+
+
+def set_route(route):
+    """Remember the route handled by this thread, used to label stage timings"""
+    _local.route = route
+
+
+def current_route():
+    return getattr(_local, 'route', 'none')
+
+
+@contextmanager
+def stage(name):
+    """Time a block as stage `name` of the current route"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe('feedback_stage_duration_seconds', time.perf_counter() - started,
+                route=current_route(), stage=name)
+
+
+def _merge(target, shard):
+    for key, values in shard.histograms.items():
+        merged = target.histograms.get(key)
+        if merged is None:
+            target.histograms[key] = list(values)
+        else:
+            for index, value in enumerate(values):
+                merged[index] += value
+    for key, value in shard.counters.items():
+        target.counters[key] = target.counters.get(key, 0) + value
+
+
+def snapshot():
+    """Merge all shards into one view (retiring shards of finished threads)"""
+    total = _Shard()
+    with _registry_lock:
+        _retire_finished()
+        _merge(total, _retired)
+        shards = list(_shards)
+    for shard in shards:
+        # Copy before merging; the owning thread may be writing concurrently
+        copy = _Shard()
+        copy.histograms = {key: list(values) for key, values in list(shard.histograms.items())}
+        copy.counters = dict(list(shard.counters.items()))
+        _merge(total, copy)
+    return total
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in items) + '}'
+
+
+HELP = {
+    'feedback_request_duration_seconds': ('histogram', 'Request latency by route'),
+    'feedback_stage_duration_seconds': ('histogram', 'Latency of request stages (auth, analyzer, db_read, db_write, serialization)'),
+    'feedback_requests_total': ('counter', 'Requests by route, method and status'),
+    'feedback_request_errors_total': ('counter', 'Requests that failed with a 5xx status or an exception'),
+}
+
+
+def render_prometheus():
+    """Prometheus text exposition of every metric"""
+    total = snapshot()
+    lines = []
+    by_name = {}
+    for (name, labels), values in total.histograms.items():
+        by_name.setdefault(name, []).append(('histogram', labels, values))
+    for (name, labels), value in total.counters.items():
+        by_name.setdefault(name, []).append(('counter', labels, value))
+
+    for name in sorted(by_name):
+        kind, help_text = HELP.get(name, (by_name[name][0][0], name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for metric_kind, labels, values in sorted(by_name[name], key=lambda item: item[1]):
+            if metric_kind == 'counter':
+                lines.append(f'{name}{_format_labels(labels)} {values}')
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS, values):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+            cumulative += values[len(BUCKETS)]
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {values[-1]:.6f}')
+            lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
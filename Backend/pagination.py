@@ -0,0 +1,74 @@
+"""
+Keyset (seek) pagination over (created_at, id), newest first.
+
+Instead of OFFSET, each page continues strictly after the last row of the
+previous page, so a deep page costs the same as the first one as long as an
+index on (created_at, id) backs the ordering.
+"""
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised for cursors that were not produced by encode_cursor()"""
+
+
+def encode_cursor(created_at, row_id):
+    """Opaque cursor pointing just past (created_at, id)"""
+    raw = json.dumps([str(created_at), row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f'Invalid cursor: {cursor}') from e
+
+
+def clamp_page_size(value):
+    try:
+        size = int(value) if value is not None else DEFAULT_PAGE_SIZE
+    except (TypeError, ValueError):
+        size = DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def build_page_query(select_sql, alias, filters=None, params=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Extend `select_sql` (a SELECT ... FROM ... without WHERE/ORDER BY) into one
+    keyset page. `alias` is the table alias owning created_at/id; `filters` are
+    extra WHERE clauses joined with AND. One row beyond `limit` is requested so
+    callers can tell whether another page exists.
+    """
+    clauses = list(filters or [])
+    params = list(params or [])
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        clauses.append(f"({alias}.created_at, {alias}.id) < (?, ?)")
+        params.extend([created_at, row_id])
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = f"""
+        {select_sql}
+        {where}
+        ORDER BY {alias}.created_at DESC, {alias}.id DESC
+        LIMIT ?
+    """
+    return sql, params + [limit + 1]
+
+
+def fetch_page(connection, select_sql, alias, filters=None, params=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Run one keyset page; returns (rows as dicts, next cursor or None)"""
+    sql, params = build_page_query(select_sql, alias, filters, params, cursor, limit)
+    rows = connection.execute(sql, params).fetchall()
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last['created_at'], last['id'])
+    return items, next_cursor
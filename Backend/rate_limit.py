@@ -0,0 +1,176 @@
+"""
+Token-bucket rate limiting keyed by user id (or client IP for anonymous calls).
+
+MemoryRateLimiter keeps one bucket per key in an LRU-ordered dict behind a
+single lock, so a check is a dict lookup plus a little arithmetic. A bucket
+that has been idle long enough to refill completely carries no information
+and is evicted, and the dict never holds more than max_keys buckets.
+
+SQLiteRateLimiter keeps the same state in a SQLite file so every worker
+process on a host shares one set of limits (set RATE_LIMIT_DB).
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
+RATE_LIMIT_DB = os.getenv('RATE_LIMIT_DB') or None
+
+
+class MemoryRateLimiter:
+    """Per-process token buckets: `rate` tokens per second, at most `burst` saved up"""
+
+    def __init__(self, name, rate, burst, max_keys=RATE_LIMIT_MAX_KEYS):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_keys = max_keys
+        self.idle_seconds = self.burst / self.rate  # time for an empty bucket to refill
+        self._buckets = OrderedDict()  # key -> [tokens, last update], least recently used first
+        self._lock = threading.Lock()
+        self._stats = {'allowed': 0, 'limited': 0, 'evicted': 0}
+
+    def acquire(self, key, cost=1):
+        """Take `cost` tokens; returns 0 when allowed, else the seconds to wait"""
+        cost = min(cost, self.burst)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                wait = 0.0
+                self._stats['allowed'] += 1
+            else:
+                wait = (cost - bucket[0]) / self.rate
+                self._stats['limited'] += 1
+            self._evict(now)
+        return wait
+
+    def _evict(self, now):
+        # Buckets are ordered by last use, so only the front can be idle
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if len(buckets) <= self.max_keys and now - bucket[1] < self.idle_seconds:
+                break
+            del buckets[key]
+            self._stats['evicted'] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, name=self.name, backend='memory', rate=self.rate,
+                        burst=self.burst, buckets=len(self._buckets), max_keys=self.max_keys)
+
+
+class SQLiteRateLimiter:
+    """Token buckets in a SQLite file shared by all worker processes on a host"""
+
+    PRUNE_EVERY = 1000  # calls between deletions of idle buckets
+
+    def __init__(self, name, rate, burst, path):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.path = path
+        self.idle_seconds = self.burst / self.rate
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._stats = {'allowed': 0, 'limited': 0, 'evicted': 0}
+
+    def _connection(self):
+        # One connection per thread, reopened after a fork
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")  # limiter state is disposable
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                    limiter TEXT NOT NULL,
+                    bucket_key TEXT NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (limiter, bucket_key)
+                ) WITHOUT ROWID
+            """)
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_rate_limit_buckets_updated ON rate_limit_buckets (updated)"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def acquire(self, key, cost=1):
+        """Take `cost` tokens; returns 0 when allowed, else the seconds to wait"""
+        cost = min(cost, self.burst)
+        now = time.time()  # wall clock: shared between processes
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated FROM rate_limit_buckets WHERE limiter = ? AND bucket_key = ?",
+                (self.name, str(key))
+            ).fetchone()
+            tokens = self.burst if row is None else min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / self.rate
+            connection.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (limiter, bucket_key, tokens, updated) VALUES (?, ?, ?, ?)",
+                (self.name, str(key), tokens, now)
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self._stats['allowed' if wait == 0.0 else 'limited'] += 1
+            self._calls += 1
+            prune = self._calls % self.PRUNE_EVERY == 0
+        if prune:
+            self.prune(now)
+        return wait
+
+    def prune(self, now=None):
+        """Delete buckets that have been idle long enough to be full again"""
+        cutoff = (now or time.time()) - self.idle_seconds
+        cursor = self._connection().execute(
+            "DELETE FROM rate_limit_buckets WHERE limiter = ? AND updated < ?", (self.name, cutoff)
+        )
+        with self._lock:
+            self._stats['evicted'] += cursor.rowcount
+
+    def stats(self):
+        buckets = self._connection().execute(
+            "SELECT COUNT(*) FROM rate_limit_buckets WHERE limiter = ?", (self.name,)
+        ).fetchone()[0]
+        with self._lock:
+            return dict(self._stats, name=self.name, backend='sqlite', rate=self.rate,
+                        burst=self.burst, buckets=buckets, path=self.path)
+
+
+def limiter_from_env(name, rate, burst):
+    """
+    Limiter configured by RATE_LIMIT_<NAME>_RATE / _BURST (defaults given),
+    shared through RATE_LIMIT_DB when set; None when rate limiting is disabled
+    """
+    if not RATE_LIMIT_ENABLED:
+        return None
+    prefix = f'RATE_LIMIT_{name.upper()}'
+    rate = float(os.getenv(f'{prefix}_RATE', rate))
+    burst = float(os.getenv(f'{prefix}_BURST', burst))
+    if RATE_LIMIT_DB:
+        return SQLiteRateLimiter(name, rate, burst, RATE_LIMIT_DB)
+    return MemoryRateLimiter(name, rate, burst)
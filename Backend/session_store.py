@@ -0,0 +1,211 @@
+"""
+Server-side sessions for issued JWTs.
+
+Every issued token is recorded in user_sessions by its SHA-256 hash, so it
+can be revoked before it expires. Revocation sets user_sessions.revoked_at
+and appends to session_revocations in the same transaction; each process
+keeps the hashes of revoked, unexpired tokens in memory, so the per-request
+check is a dict lookup and never a query. A background thread pulls log
+entries past the last id it has seen every SESSION_SYNC_INTERVAL seconds and
+deletes expired rows in small batches through the expires_at indexes.
+"""
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
+
+from database_sqlite import get_db_connection
+
+SESSION_SYNC_INTERVAL = float(os.getenv('SESSION_SYNC_INTERVAL', 5))
+SESSION_SWEEP_INTERVAL = float(os.getenv('SESSION_SWEEP_INTERVAL', 300))
+SESSION_SWEEP_BATCH = int(os.getenv('SESSION_SWEEP_BATCH', 500))
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def token_hash(token):
+    """Stored and cached form of a token; the token itself is never persisted"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def _timestamp(epoch):
+    return datetime.utcfromtimestamp(epoch).strftime(TIMESTAMP_FORMAT)
+
+
+def _epoch(timestamp):
+    return (datetime.strptime(str(timestamp)[:19], TIMESTAMP_FORMAT) - datetime(1970, 1, 1)).total_seconds()
+
+
+class SessionStore:
+    """Records sessions, revokes them and answers is_revoked() from memory"""
+
+    def __init__(self, sync_interval=SESSION_SYNC_INTERVAL, sweep_interval=SESSION_SWEEP_INTERVAL,
+                 sweep_batch=SESSION_SWEEP_BATCH):
+        self.sync_interval = sync_interval
+        self.sweep_interval = sweep_interval
+        self.sweep_batch = sweep_batch
+        self._revoked = {}  # token hash -> expiry (epoch seconds)
+        self._lock = threading.Lock()
+        self._last_revocation_id = 0  # newest session_revocations id seen
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'recorded': 0, 'revoked': 0, 'syncs': 0, 'swept': 0, 'sweeps': 0}
+
+    def record(self, user_id, token_hash, expires_at):
+        """Store a newly issued token (expires_at in epoch seconds)"""
+        connection = get_db_connection()
+        try:
+            connection.execute(
+                "INSERT INTO user_sessions (user_id, token_hash, expires_at) VALUES (?, ?, ?)",
+                (user_id, token_hash, _timestamp(expires_at))
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        with self._lock:
+            self._stats['recorded'] += 1
+
+    def is_revoked(self, token_hash):
+        return token_hash in self._revoked
+
+    def revoke(self, user_id, token_hash, expires_at):
+        """Revoke one token, recording it first if it was issued without a session row"""
+        now = _timestamp(time.time())
+        connection = get_db_connection()
+        try:
+            cursor = connection.execute(
+                "UPDATE user_sessions SET revoked_at = ? WHERE token_hash = ? AND revoked_at IS NULL",
+                (now, token_hash)
+            )
+            if cursor.rowcount == 0:
+                connection.execute("""
+                    INSERT INTO user_sessions (user_id, token_hash, expires_at, revoked_at)
+                    VALUES (?, ?, ?, ?)
+                """, (user_id, token_hash, _timestamp(expires_at), now))
+            connection.execute(
+                "INSERT INTO session_revocations (token_hash, expires_at) VALUES (?, ?)",
+                (token_hash, _timestamp(expires_at))
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        self._remember({token_hash: expires_at})
+
+    def revoke_user(self, user_id):
+        """Revoke every unexpired session of a user ("log out everywhere")"""
+        now = _timestamp(time.time())
+        connection = get_db_connection()
+        try:
+            rows = connection.execute("""
+                SELECT token_hash, expires_at FROM user_sessions
+                WHERE user_id = ? AND revoked_at IS NULL AND expires_at > ?
+            """, (user_id, now)).fetchall()
+            connection.executemany(
+                "INSERT INTO session_revocations (token_hash, expires_at) VALUES (?, ?)",
+                [(row['token_hash'], row['expires_at']) for row in rows]
+            )
+            connection.execute(
+                "UPDATE user_sessions SET revoked_at = ? WHERE user_id = ? AND revoked_at IS NULL",
+                (now, user_id)
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        self._remember({row['token_hash']: _epoch(row['expires_at']) for row in rows})
+        return len(rows)
+
+    def _remember(self, revoked):
+        with self._lock:
+            self._revoked.update(revoked)
+            self._stats['revoked'] += len(revoked)
+
+    def sync(self):
+        """Load revocations logged since the last sync (by any process) and forget expired ones"""
+        now = time.time()
+        connection = get_db_connection()
+        try:
+            # The watermark is a log id, not a clock reading, so neither commits
+            # landing out of timestamp order nor skew between hosts can hide one
+            rows = connection.execute("""
+                SELECT id, token_hash, expires_at FROM session_revocations
+                WHERE id > ? ORDER BY id
+            """, (self._last_revocation_id,)).fetchall()
+        finally:
+            connection.close()
+        with self._lock:
+            for row in rows:
+                self._revoked[row['token_hash']] = _epoch(row['expires_at'])
+                self._last_revocation_id = max(self._last_revocation_id, row['id'])
+            for key in [key for key, expires in self._revoked.items() if expires <= now]:
+                del self._revoked[key]
+            self._stats['syncs'] += 1
+
+    def sweep(self):
+        """Delete expired sessions in small batches (each its own short transaction)"""
+        cutoff = _timestamp(time.time())
+        connection = get_db_connection()
+        try:
+            # Log entries of expired tokens are never read again
+            connection.execute("DELETE FROM session_revocations WHERE expires_at < ?", (cutoff,))
+            connection.commit()
+        finally:
+            connection.close()
+        deleted = 0
+        while not self._stop.is_set():
+            connection = get_db_connection()
+            try:
+                cursor = connection.execute("""
+                    DELETE FROM user_sessions WHERE id IN (
+                        SELECT id FROM user_sessions WHERE expires_at < ? LIMIT ?
+                    )
+                """, (cutoff, self.sweep_batch))
+                connection.commit()
+            finally:
+                connection.close()
+            deleted += cursor.rowcount
+            if cursor.rowcount < self.sweep_batch:
+                break
+            time.sleep(0.01)  # let request writes in between batches
+        with self._lock:
+            self._stats['swept'] += deleted
+            self._stats['sweeps'] += 1
+        return deleted
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"Warning: could not load revoked sessions (will retry): {e}")
+            self._thread = threading.Thread(target=self._run, name='session-sweeper', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        next_sweep = time.monotonic()
+        while not self._stop.wait(self.sync_interval):
+            try:
+                self.sync()
+                if time.monotonic() >= next_sweep:
+                    self.sweep()
+                    next_sweep = time.monotonic() + self.sweep_interval
+            except Exception as e:
+                print(f"Session sweeper error: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['revoked_in_memory'] = len(self._revoked)
+        stats['last_revocation_id'] = self._last_revocation_id
+        stats['running'] = self._thread is not None and self._thread.is_alive()
+        return stats
+
+
+session_store = SessionStore()
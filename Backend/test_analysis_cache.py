@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the two-tier cache in analysis_cache.py:
+    python -m pytest test_analysis_cache.py
+"""
+import os
+import sqlite3
+import tempfile
+import time
+
+from analysis_cache import AnalysisCache
+
+
+def cache_file():
+    return os.path.join(tempfile.mkdtemp(prefix='analysis-cache-test-'), 'cache.db')
+
+
+def persisted_rows(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_set_many_persists_a_batch_for_the_next_process():
+    path = cache_file()
+    cache = AnalysisCache(max_entries=100, db_path=path)
+    items = [(f'key-{index}', {'sentiment': 'positive', 'n': index}) for index in range(1000)]
+    cache.set_many(items + [('failed', {'error': 'model timed out'})])
+    assert persisted_rows(path) == 1000
+
+    restarted = AnalysisCache(max_entries=100, db_path=path)
+    found = restarted.get_many([key for key, _ in items] + ['unknown'])
+    assert found['key-999'] == {'sentiment': 'positive', 'n': 999}
+    assert found['unknown'] is None and found.get('failed') is None
+    stats = restarted.stats()
+    assert stats['persistent_hits'] == 1000 and stats['misses'] == 1
+    # Persistent hits are promoted to the (bounded) memory tier
+    assert stats['size'] == 100
+    assert restarted.get('key-999') == {'sentiment': 'positive', 'n': 999}
+    assert restarted.stats()['hits'] == 1
+
+
+def test_expired_rows_are_pruned():
+    path = cache_file()
+    cache = AnalysisCache(ttl_seconds=0.05, db_path=path)
+    cache.set_many([(f'key-{index}', {'sentiment': 'neutral'}) for index in range(20)])
+    time.sleep(0.1)
+    assert cache.get('key-0') is None
+    assert cache.prune() == 20
+    assert persisted_rows(path) == 0
+    # Opening the file prunes too, so an idle cache does not grow without bound
+    cache.set_many([(f'key-{index}', {'sentiment': 'neutral'}) for index in range(5)])
+    time.sleep(0.1)
+    AnalysisCache(db_path=path)
+    assert persisted_rows(path) == 0
+
+
+def test_writes_prune_periodically():
+    path = cache_file()
+    cache = AnalysisCache(ttl_seconds=0.05, db_path=path)
+    cache.PRUNE_EVERY = 10
+    cache.set_many([(f'old-{index}', {'sentiment': 'neutral'}) for index in range(9)])
+    time.sleep(0.1)
+    cache.set('new', {'sentiment': 'positive'})
+    assert persisted_rows(path) == 1
+    assert cache.stats()['pruned'] == 9
+
+
+def test_invalidate_clears_both_tiers():
+    path = cache_file()
+    cache = AnalysisCache(db_path=path)
+    cache.set('key', {'sentiment': 'positive'})
+    cache.invalidate()
+    assert cache.get('key') is None
+    assert persisted_rows(path) == 0
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the write-behind writer in analysis_writer.py.
+A recording save function stands in for the database:
+    python -m pytest test_analysis_writer.py
+"""
+import sqlite3
+import threading
+import time
+
+from analysis_writer import AnalysisWriter
+
+
+class RecordingSave:
+    """Collects saved batches; can fail a few times or block the writer thread"""
+
+    def __init__(self, transient_failures=0, reject=None):
+        self.batches = []
+        self.transient_failures = transient_failures
+        self.reject = reject
+        self.writer_gate = threading.Event()
+        self.writer_gate.set()
+        self._lock = threading.Lock()
+
+    def __call__(self, rows):
+        if threading.current_thread().name == 'analysis-writer':
+            self.writer_gate.wait()
+        with self._lock:
+            if self.transient_failures:
+                self.transient_failures -= 1
+                raise sqlite3.OperationalError('database is locked')
+            if self.reject is not None and self.reject in rows:
+                raise sqlite3.IntegrityError('FOREIGN KEY constraint failed')
+            self.batches.append(list(rows))
+        return len(rows)
+
+    @property
+    def rows(self):
+        with self._lock:
+            return [row for batch in self.batches for row in batch]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not met in time')
+        time.sleep(0.005)
+
+
+def test_flushes_when_batch_is_full():
+    save = RecordingSave()
+    writer = AnalysisWriter(flush_rows=10, flush_interval_ms=5000, save=save).start()
+    try:
+        started = time.monotonic()
+        assert writer.enqueue(list(range(10)))
+        wait_for(lambda: len(save.rows) == 10)
+        # Written as one batch long before the 5 s interval
+        assert time.monotonic() - started < 1
+        assert save.batches == [list(range(10))]
+    finally:
+        writer.stop()
+
+
+def test_flushes_partial_batch_after_interval():
+    save = RecordingSave()
+    writer = AnalysisWriter(flush_rows=1000, flush_interval_ms=50, save=save).start()
+    try:
+        assert writer.enqueue(['a', 'b', 'c'])
+        wait_for(lambda: save.rows == ['a', 'b', 'c'])
+        assert writer.stats()['flushes'] == 1
+    finally:
+        writer.stop()
+
+
+def test_partially_enqueued_request_writes_the_rest_itself():
+    save = RecordingSave()
+    save.writer_gate.clear()  # the writer thread stalls inside its first flush
+    writer = AnalysisWriter(max_queue=5, flush_rows=1, flush_interval_ms=10,
+                            put_timeout=0.05, save=save).start()
+    try:
+        assert writer.enqueue(['first'])
+        wait_for(lambda: writer.stats()['queue_depth'] == 0)
+        rows = [f'row-{index}' for index in range(8)]
+        assert writer.enqueue(rows)
+        # The 3 rows that did not fit were saved synchronously by the caller
+        assert save.rows == rows[5:]
+        stats = writer.stats()
+        assert stats['enqueued'] == 6 and stats['rejected'] == 3
+    finally:
+        save.writer_gate.set()
+        writer.stop()
+    assert sorted(save.rows) == sorted(['first'] + rows)
+
+
+def test_stop_drains_the_queue():
+    save = RecordingSave()
+    writer = AnalysisWriter(flush_rows=1000, flush_interval_ms=5000, save=save).start()
+    assert writer.enqueue(list(range(250)))
+    writer.stop()
+    assert sorted(save.rows) == list(range(250))
+    assert not writer.enqueue([1])
+
+
+def test_transient_errors_are_retried():
+    save = RecordingSave(transient_failures=2)
+    writer = AnalysisWriter(flush_rows=5, flush_interval_ms=20, retry_backoff_ms=1, save=save).start()
+    try:
+        assert writer.enqueue(list(range(5)))
+        wait_for(lambda: len(save.rows) == 5)
+        stats = writer.stats()
+        assert stats['retries'] == 2 and stats['rows_failed'] == 0
+    finally:
+        writer.stop()
+
+
+def test_only_unwritable_rows_are_dropped():
+    save = RecordingSave(reject='bad')
+    writer = AnalysisWriter(flush_rows=8, flush_interval_ms=20, save=save).start()
+    rows = ['r0', 'r1', 'r2', 'bad', 'r4', 'r5', 'r6', 'r7']
+    assert writer.enqueue(rows)
+    writer.stop()
+    assert sorted(save.rows) == sorted(row for row in rows if row != 'bad')
+    stats = writer.stats()
+    assert stats['rows_written'] == 7 and stats['rows_failed'] == 1
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the schema migrations in database_sqlite.py.
+Each test runs against its own throwaway SQLite database:
+    python -m pytest test_database_sqlite.py
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+BROKEN_MIGRATION = (99, 'fails halfway', [
+    "ALTER TABLE user_analyses ADD COLUMN half_applied TEXT",
+    "INSERT INTO no_such_table VALUES (1)",
+])
+
+
+@contextmanager
+def fresh_database(migrations=None):
+    """
+    Point database_sqlite at a new empty file (base tables only when
+    migrations=[]). Imported here rather than at module level so this file
+    does not decide the DB_PATH other test modules import it with.
+    """
+    import database_sqlite
+    saved = database_sqlite.DB_PATH, database_sqlite._pool, database_sqlite.MIGRATIONS
+    database_sqlite.DB_PATH = os.path.join(tempfile.mkdtemp(prefix='database-test-'), 'test.db')
+    database_sqlite._pool = None
+    try:
+        if migrations is not None:
+            database_sqlite.MIGRATIONS = migrations
+            database_sqlite.init_db()
+            database_sqlite.MIGRATIONS = saved[2]
+        yield database_sqlite, database_sqlite.DB_PATH
+    finally:
+        if database_sqlite._pool is not None:
+            database_sqlite._pool.close_all()
+        database_sqlite.DB_PATH, database_sqlite._pool, database_sqlite.MIGRATIONS = saved
+
+
+def columns(path, table):
+    connection = sqlite3.connect(path)
+    try:
+        return {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+    finally:
+        connection.close()
+
+
+def applied_versions(path):
+    connection = sqlite3.connect(path)
+    try:
+        return [row[0] for row in connection.execute("SELECT version FROM schema_migrations ORDER BY version")]
+    finally:
+        connection.close()
+
+
+def test_failed_migration_is_rolled_back_completely():
+    with fresh_database(migrations=[]) as (database_sqlite, path):
+        database_sqlite.MIGRATIONS = database_sqlite.MIGRATIONS + [BROKEN_MIGRATION]
+        try:
+            database_sqlite.run_migrations()
+        except sqlite3.OperationalError:
+            pass
+        else:
+            raise AssertionError('the broken migration should have failed')
+        # Earlier migrations stay applied; the ALTER of the failed one does not
+        assert applied_versions(path) == [version for version, _, _ in database_sqlite.MIGRATIONS[:-1]]
+        assert 'half_applied' not in columns(path, 'user_analyses')
+
+        # Once fixed, the next startup applies it instead of failing on a duplicate column
+        database_sqlite.MIGRATIONS[-1] = (99, 'fixed', BROKEN_MIGRATION[2][:1])
+        assert database_sqlite.run_migrations() == [99]
+        assert 'half_applied' in columns(path, 'user_analyses')
+
+
+def test_concurrent_workers_apply_each_migration_once():
+    with fresh_database(migrations=[]) as (database_sqlite, path):
+        errors, applied = [], []
+
+        def worker():
+            try:
+                applied.extend(database_sqlite.run_migrations())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        expected = [version for version, _, _ in database_sqlite.MIGRATIONS]
+        assert not errors, errors
+        assert sorted(applied) == expected
+        assert applied_versions(path) == expected
+        assert database_sqlite.run_migrations() == []
+
+
+def test_timestamps_are_normalized_to_utc():
+    from database_sqlite import to_db_timestamp
+
+    assert to_db_timestamp('2024-01-05T10:00:00Z') == '2024-01-05 10:00:00'
+    assert to_db_timestamp('2024-01-05T12:30:00+02:00') == '2024-01-05 10:30:00'
+    assert to_db_timestamp('2024-01-05') == '2024-01-05 00:00:00'
+    assert to_db_timestamp('2024-01-05 10:00:00.250') == '2024-01-05 10:00:00'
+    assert to_db_timestamp(1704450000) == to_db_timestamp('1704450000') == '2024-01-05 10:20:00'
+    for bad in ('not a date', '', None):
+        try:
+            to_db_timestamp(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f'{bad!r} should be rejected')
+
+
+def database_with_history(database_sqlite):
+    """
+    Two users' analyses after inserts, then re-labels, confidence changes,
+    moves between buckets and users, and deletes; returns the user ids
+    """
+    database_sqlite.init_db()
+    connection = database_sqlite.get_db_connection()
+    try:
+        users = [
+            connection.execute("INSERT INTO users (email) VALUES (?)", (f'history{index}@example.com',)).lastrowid
+            for index in range(2)
+        ]
+        connection.commit()
+    finally:
+        connection.close()
+
+    sentiments = ['positive', 'negative', 'neutral']
+    confidences = [0.5, 0.75, None, 0.25]
+    database_sqlite.save_analyses([
+        (users[index % 2], f'text {index}', sentiments[index % 3], confidences[index % 4],
+         f'2024-01-{1 + index % 3:02d} {index % 5:02d}:{index % 60:02d}:00', 'llm_mock')
+        for index in range(120)
+    ])
+
+    connection = database_sqlite.get_db_connection()
+    try:
+        connection.execute("UPDATE user_analyses SET sentiment = 'positive' WHERE id % 7 = 0")
+        connection.execute("UPDATE user_analyses SET confidence = 0.5 WHERE id % 11 = 0")
+        connection.execute("UPDATE user_analyses SET created_at = '2024-02-01 12:00:00' WHERE id % 13 = 0")
+        connection.execute("UPDATE user_analyses SET user_id = ? WHERE id % 17 = 0", (users[0],))
+        connection.execute("DELETE FROM user_analyses WHERE id % 5 = 0")
+        connection.commit()
+    finally:
+        connection.close()
+    return users
+
+
+def test_counters_match_the_raw_rows():
+    with fresh_database() as (database_sqlite, path):
+        database_with_history(database_sqlite)
+        counts = database_sqlite.get_counts()
+        connection = database_sqlite.get_db_connection()
+        try:
+            assert counts['analyses'] == connection.execute("SELECT COUNT(*) FROM user_analyses").fetchone()[0]
+            assert counts['users'] == 2
+            assert counts['sentiments'] == {
+                row[0]: row[1] for row in
+                connection.execute("SELECT sentiment, COUNT(*) FROM user_analyses GROUP BY sentiment")
+            }
+        finally:
+            connection.close()
+
+        # A rebuild from scratch agrees with what the triggers maintained
+        database_sqlite.rebuild_counters()
+        assert database_sqlite.get_counts() == counts
+
+
+def raw_rollups(connection, fmt, user_id=None):
+    """What get_sentiment_rollups() should return, computed from user_analyses directly"""
+    where, params = ("WHERE user_id = ?", [user_id]) if user_id is not None else ("", [])
+    buckets = {}
+    for bucket, sentiment, analyses, confidence_sum, confidence_count in connection.execute(f"""
+        SELECT strftime('{fmt}', created_at), sentiment, COUNT(*), TOTAL(confidence), COUNT(confidence)
+        FROM user_analyses {where} GROUP BY 1, 2
+    """, params):
+        entry = buckets.setdefault(bucket, {'bucket': bucket, 'analyses': 0, 'sentiments': {}, 'sum': 0.0, 'count': 0})
+        entry['analyses'] += analyses
+        entry['sentiments'][sentiment] = analyses
+        entry['sum'] += confidence_sum
+        entry['count'] += confidence_count
+    for entry in buckets.values():
+        total, count = entry.pop('sum'), entry.pop('count')
+        entry['avg_confidence'] = round(total / count, 4) if count else None
+    return [buckets[bucket] for bucket in sorted(buckets)]
+
+
+def test_rollups_match_the_raw_rows():
+    with fresh_database() as (database_sqlite, path):
+        users = database_with_history(database_sqlite)
+        connection = database_sqlite.get_db_connection()
+        try:
+            for granularity, (_, fmt) in database_sqlite.ROLLUP_GRANULARITIES.items():
+                assert database_sqlite.get_sentiment_rollups(granularity) == raw_rollups(connection, fmt)
+                for user_id in users:
+                    assert (database_sqlite.get_sentiment_rollups(granularity, user_id=user_id)
+                            == raw_rollups(connection, fmt, user_id))
+        finally:
+            connection.close()
+
+        # A rebuild from scratch agrees with what the triggers maintained
+        before = database_sqlite.get_sentiment_rollups('hour')
+        database_sqlite.rebuild_rollups()
+        assert database_sqlite.get_sentiment_rollups('hour') == before
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Offline checks for Google ID token verification in google_oauth.py.
+A local HTTP server stands in for Google's certificate endpoint and tokens
+are signed with a throwaway key, so no network access is needed:
+    python -m pytest test_google_oauth.py
+"""
+import datetime
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+import google_oauth
+from google_oauth import CachingRequest, cache_lifetime, verify_google_id_token
+
+CLIENT_ID = 'test-client.apps.googleusercontent.com'
+KEY_ID = 'test-key'
+
+
+def make_key_and_cert():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'certs.test')])
+    now = datetime.datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode('ascii')
+
+
+PRIVATE_PEM, CERT_PEM = make_key_and_cert()
+SIGNER = crypt.RSASigner.from_string(PRIVATE_PEM, key_id=KEY_ID)
+
+
+class CertServer:
+    """Serves {key id: certificate} with a configurable Cache-Control header"""
+
+    def __init__(self, cache_control='public, max-age=3600'):
+        self.cache_control = cache_control
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                body = json.dumps({KEY_ID: CERT_PEM}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                if server.cache_control:
+                    self.send_header('Cache-Control', server.cache_control)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}/oauth2/v1/certs'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def make_token(audience=CLIENT_ID, issuer='https://accounts.google.com', lifetime=3600, **claims):
+    now = int(time.time())
+    payload = dict({
+        'iss': issuer, 'aud': audience, 'sub': '1234567890',
+        'email': 'user@example.com', 'iat': now, 'exp': now + lifetime
+    }, **claims)
+    return jwt.encode(SIGNER, payload).decode('ascii')
+
+
+def verify(token, server, request):
+    return verify_google_id_token(token, CLIENT_ID, certs_url=server.url, request=request)
+
+
+def test_certificates_are_fetched_once_within_max_age():
+    google_oauth.clear_caches()
+    server = CertServer('public, max-age=3600')
+    try:
+        request = CachingRequest()
+        for index in range(5):
+            claims = verify(make_token(nonce=str(index)), server, request)
+            assert claims['email'] == 'user@example.com'
+        assert server.requests == 1
+        assert request.stats()['hits'] == 4
+    finally:
+        server.close()
+
+
+def test_certificates_are_refetched_after_max_age():
+    google_oauth.clear_caches()
+    server = CertServer('public, max-age=1')
+    try:
+        request = CachingRequest()
+        verify(make_token(nonce='a'), server, request)
+        verify(make_token(nonce='b'), server, request)
+        assert server.requests == 1
+        time.sleep(1.1)
+        verify(make_token(nonce='c'), server, request)
+        assert server.requests == 2
+    finally:
+        server.close()
+
+
+def test_uncacheable_responses_are_not_cached():
+    google_oauth.clear_caches()
+    server = CertServer('no-cache, no-store')
+    try:
+        request = CachingRequest()
+        verify(make_token(nonce='a'), server, request)
+        verify(make_token(nonce='b'), server, request)
+        assert server.requests == 2
+    finally:
+        server.close()
+
+
+def test_verified_tokens_skip_verification():
+    google_oauth.clear_caches()
+    server = CertServer(None)
+    try:
+        request = CachingRequest()
+        token = make_token()
+        for _ in range(3):
+            assert verify(token, server, request)['sub'] == '1234567890'
+        # Certificates are uncacheable here, so any second verification would refetch
+        assert server.requests == 1
+    finally:
+        server.close()
+
+
+def test_invalid_tokens_raise_value_error():
+    google_oauth.clear_caches()
+    server = CertServer()
+    try:
+        request = CachingRequest()
+        for token in (make_token(audience='someone-else'), make_token(issuer='https://evil.example'),
+                      make_token(lifetime=-600)):
+            try:
+                verify(token, server, request)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError('token should have been rejected')
+    finally:
+        server.close()
+
+
+def test_cache_lifetime_honours_age():
+    assert cache_lifetime({'Cache-Control': 'public, max-age=300'}) == 300
+    assert cache_lifetime({'Cache-Control': 'public, max-age=300', 'Age': '120'}) == 180
+    assert cache_lifetime({'Cache-Control': 'private, no-cache'}) == 0
+    assert cache_lifetime({}) == 0
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the bulk importer in ingest.py.
+Ingests small JSONL files into a throwaway SQLite database:
+    python -m pytest test_ingest.py
+"""
+import json
+import os
+import tempfile
+
+import pytest
+
+import database_sqlite
+from ingest import ingest, iter_records, parse_args
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix='ingest-test-'), 'ingest.db')
+
+
+@pytest.fixture(autouse=True)
+def ingest_database():
+    # Other test modules point database_sqlite at their own file; use ours here
+    saved = database_sqlite.DB_PATH, database_sqlite._pool
+    database_sqlite.DB_PATH, database_sqlite._pool = DB_PATH, None
+    database_sqlite.init_db()
+    yield
+    database_sqlite._pool.close_all()
+    database_sqlite.DB_PATH, database_sqlite._pool = saved
+
+
+def write_jsonl(lines):
+    path = os.path.join(tempfile.mkdtemp(prefix='ingest-input-'), 'feedback.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return path
+
+
+def make_user():
+    connection = database_sqlite.get_db_connection()
+    try:
+        user_id = connection.execute(
+            "INSERT INTO users (email) VALUES (?)", (f'ingest-{os.urandom(4).hex()}@example.com',)
+        ).lastrowid
+        connection.commit()
+    finally:
+        connection.close()
+    return user_id
+
+
+def stored_texts(user_id):
+    connection = database_sqlite.get_db_connection()
+    try:
+        return sorted(row[0] for row in connection.execute(
+            "SELECT feedback_text FROM user_analyses WHERE user_id = ?", (user_id,)
+        ))
+    finally:
+        connection.close()
+
+
+def run(path, user_id):
+    return ingest(parse_args([path, '--user-id', str(user_id), '--workers', '1',
+                              '--chunk-size', '2', '--backend', 'llm_mock']))
+
+
+def test_corrupt_line_is_skipped_and_the_run_continues(capsys):
+    user_id = make_user()
+    path = write_jsonl([
+        json.dumps({'text': 'Great product, love it'}),
+        '{"text": "cut off mid-wri',
+        json.dumps({'text': 'Terrible support, very slow'}),
+    ])
+    assert list(iter_records(path))[1] is None
+    assert 'line 2' in capsys.readouterr().err
+
+    summary = run(path, user_id)
+    assert summary['rows'] == 3 and summary['written'] == 2 and summary['skipped'] == 1
+    assert stored_texts(user_id) == ['Great product, love it', 'Terrible support, very slow']
+
+
+def test_missing_or_blank_text_is_skipped_before_analysis():
+    user_id = make_user()
+    path = write_jsonl([
+        json.dumps({'text': 'Works well'}),
+        json.dumps({'text': '   '}),
+        json.dumps({'other': 'no text key'}),
+        json.dumps({'text': None}),
+        json.dumps({'text': ''}),
+    ])
+    summary = run(path, user_id)
+    assert summary['rows'] == 5 and summary['written'] == 1 and summary['skipped'] == 4
+    assert stored_texts(user_id) == ['Works well']
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the async analysis path in llm.py.
+A fake chat model with simulated latency replaces OpenAI, and a local
+OpenAI-compatible server stands in for the API when the real client is used:
+    python -m pytest test_llm_async.py
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key-not-used')
+
+import llm
+from llm_fake import SlowFakeChatModel
+
+
+def use_fake(latency=0.05):
+    fake = SlowFakeChatModel(latency=latency)
+    llm.set_model(fake)
+    return fake
+
+
+def test_results_keep_input_order():
+    use_fake(latency=0.01)
+    texts = ['I love it', 'I hate it', 'it is a thing'] * 5
+    results = asyncio.run(llm.analyze_feedback_batch_async(texts, generate_reply=False))
+    assert [r['feedback'] for r in results] == texts
+    assert [r['sentiment'] for r in results[:3]] == ['positive', 'negative', 'neutral']
+
+
+def test_concurrency_is_bounded_and_scales():
+    fake = use_fake(latency=0.05)
+    texts = ['I love it'] * 20
+    started = time.perf_counter()
+    asyncio.run(llm.analyze_feedback_batch_async(texts, generate_reply=False, max_concurrency=10))
+    elapsed = time.perf_counter() - started
+    assert fake.peak_in_flight == 10
+    # 20 calls x 50 ms at 10-way concurrency ~ 0.1 s, versus 1 s sequentially
+    assert elapsed < 0.5
+
+
+def test_reply_generation_uses_two_calls_per_item():
+    fake = use_fake(latency=0.01)
+    results = asyncio.run(llm.analyze_feedback_batch_async(['I love it', 'I hate it']))
+    assert all(r['reply'] == 'Thanks for the feedback!' for r in results)
+    assert fake.calls == 4
+
+
+def test_timeouts_are_reported_per_item():
+    use_fake(latency=0.2)
+    results = asyncio.run(
+        llm.analyze_feedback_batch_async(['I love it'] * 3, generate_reply=False, timeout=0.05)
+    )
+    assert all('timed out' in r['error'] for r in results)
+
+
+def test_cancelling_the_batch_cancels_model_calls():
+    fake = use_fake(latency=1)
+
+    async def run_and_cancel():
+        task = asyncio.create_task(
+            llm.analyze_feedback_batch_async(['I love it'] * 4, generate_reply=False)
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    asyncio.run(run_and_cancel())
+    assert time.perf_counter() - started < 0.5
+    assert fake.in_flight == 0
+
+
+def test_sync_batch_wrapper_runs_the_async_path():
+    fake = use_fake(latency=0.05)
+    results = llm.analyze_feedback_batch(['I love it'] * 8, generate_reply=False)
+    assert len(results) == 8 and fake.peak_in_flight > 1
+
+
+class ChatCompletionsServer:
+    """Minimal OpenAI-compatible /v1/chat/completions with keep-alive connections"""
+
+    def __init__(self):
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep connections open, like the real API
+
+            def do_POST(self):
+                server.requests += 1
+                request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                prompt = request['messages'][-1]['content']
+                if prompt.startswith('classify'):
+                    sentiment = 'positive' if 'love' in prompt.lower() else 'negative'
+                    content = '{"sentiment": "%s"}' % sentiment
+                else:
+                    content = 'Thanks for the feedback!'
+                body = json.dumps({
+                    'id': f'chatcmpl-{server.requests}', 'object': 'chat.completion',
+                    'created': int(time.time()), 'model': request['model'],
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': content}}],
+                    'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2},
+                }).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}/v1'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def test_real_client_survives_repeated_sync_batches():
+    from langchain_openai import ChatOpenAI
+
+    server = ChatCompletionsServer()
+    try:
+        llm.set_model(ChatOpenAI(model='gpt-test', api_key='test-key', base_url=server.url, max_retries=0))
+        # The client's pooled async connections must outlive each sync call
+        for _ in range(3):
+            results = llm.analyze_feedback_batch(['I love it', 'I hate it'], generate_reply=False)
+            assert [r.get('sentiment') for r in results] == ['positive', 'negative'], results
+        results = llm.analyze_feedback_batch(['I love it'])
+        assert results[0]['reply'] == 'Thanks for the feedback!', results
+        assert server.requests == 8
+    finally:
+        server.close()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the confidence cascade in llm_cascade.py.
+llm_mock is the fast tier and a fake chat model stands in for OpenAI:
+    python -m pytest test_llm_cascade.py
+"""
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key-not-used')
+
+import database_sqlite
+import llm
+import llm_cascade
+from llm_fake import SlowFakeChatModel
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix='cascade-test-'), 'cascade.db')
+
+# llm_mock scores: 'Great product, excellent support' 0.8 and 'I love it' 0.7
+# (kept at the default 0.7 threshold); 'lovely day' and 'The box arrived on
+# Tuesday' 0.5 (escalated). The fake LLM calls anything containing 'love' positive.
+CONFIDENT = ['Great product, excellent support', 'I love it']
+UNCERTAIN = ['lovely day', 'The box arrived on Tuesday']
+
+
+@pytest.fixture
+def fake_llm():
+    fake = SlowFakeChatModel(latency=0.001)
+    llm.set_model(fake)
+    return fake
+
+
+@pytest.fixture
+def cascade_database():
+    # Other test modules point database_sqlite at their own file; use ours here
+    saved = database_sqlite.DB_PATH, database_sqlite._pool
+    database_sqlite.DB_PATH, database_sqlite._pool = DB_PATH, None
+    database_sqlite.init_db()
+    yield database_sqlite
+    database_sqlite._pool.close_all()
+    database_sqlite.DB_PATH, database_sqlite._pool = saved
+
+
+def test_only_texts_below_the_threshold_escalate(fake_llm):
+    assert llm_cascade.CASCADE_THRESHOLD == 0.7
+    before = llm_cascade.get_stats()
+    results = llm_cascade.analyze_feedback_batch(CONFIDENT + UNCERTAIN, generate_reply=False)
+    assert [result['tier'] for result in results] == ['llm_mock', 'llm_mock', 'llm', 'llm']
+    # One classifier call per escalated text, none for the confident ones
+    assert fake_llm.calls == len(UNCERTAIN)
+    stats = llm_cascade.get_stats()
+    assert stats['analyzed'] - before['analyzed'] == 4
+    assert stats['escalated'] - before['escalated'] == 2
+
+
+def test_batch_order_is_kept_after_partial_escalation(fake_llm):
+    texts = [UNCERTAIN[0], CONFIDENT[0], UNCERTAIN[1], CONFIDENT[1], UNCERTAIN[0]]
+    results = llm_cascade.analyze_feedback_batch(texts, generate_reply=False)
+    assert [result['feedback'] for result in results] == texts
+    assert [result['tier'] for result in results] == ['llm', 'llm_mock', 'llm', 'llm_mock', 'llm']
+    # The escalated answers come from the LLM, not the fast tier's neutral guess
+    assert [result['sentiment'] for result in results] == [
+        'positive', 'positive', 'neutral', 'positive', 'positive'
+    ]
+
+
+def test_stored_tier_names_the_model_that_answered(fake_llm, cascade_database):
+    import app
+
+    connection = cascade_database.get_db_connection()
+    try:
+        user_id = connection.execute("INSERT INTO users (email) VALUES ('cascade@example.com')").lastrowid
+        connection.commit()
+    finally:
+        connection.close()
+
+    results = llm_cascade.analyze_feedback_batch(CONFIDENT + UNCERTAIN, generate_reply=False)
+    assert app.persist_analyses(user_id, results) == 4
+    connection = cascade_database.get_db_connection()
+    try:
+        stored = {row['feedback_text']: (row['tier'], row['confidence']) for row in connection.execute(
+            "SELECT feedback_text, tier, confidence FROM user_analyses WHERE user_id = ?", (user_id,)
+        )}
+    finally:
+        connection.close()
+    assert stored == {
+        'Great product, excellent support': ('llm_mock', 0.8),
+        'I love it': ('llm_mock', 0.7),
+        'lovely day': ('llm', None),
+        'The box arrived on Tuesday': ('llm', None),
+    }
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the lexicon analyzer in llm_mock.py:
+    python -m pytest test_llm_mock.py
+"""
+import json
+import os
+import tempfile
+
+import llm_mock
+
+
+def test_terms_match_whole_words_only():
+    # Substring matching used to score these as positive/negative
+    for text in ('goodbye everyone', 'it moved slowly', 'a badge and a hatchback'):
+        result = llm_mock.analyze_feedback(text)
+        assert result['sentiment'] == 'neutral', text
+        assert result['confidence'] == 0.5
+    assert llm_mock.analyze_feedback('good bye')['sentiment'] == 'positive'
+    assert llm_mock.analyze_feedback('so slow!')['sentiment'] == 'negative'
+
+
+def test_matching_ignores_case_and_punctuation():
+    result = llm_mock.analyze_feedback('GOOD, great. Not BAD?')
+    assert result['sentiment'] == 'positive'
+    assert '2 positive and 1 negative' in result['message']
+
+
+def test_weighted_lexicon_from_file():
+    path = os.path.join(tempfile.mkdtemp(prefix='lexicon-test-'), 'lexicon.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'positive': {'good': 1.0}, 'negative': {'slow': 3.0}}, f)
+    try:
+        lexicon = llm_mock.reload_lexicon(path)
+        assert lexicon.weights == {'good': 1.0, 'slow': -3.0}
+        assert llm_mock.analyze_feedback('good but slow')['sentiment'] == 'negative'
+        assert llm_mock.analyze_feedback('good but slowly')['sentiment'] == 'positive'
+    finally:
+        llm_mock.reload_lexicon()
+    assert llm_mock.get_model_version() != lexicon.version
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the scikit-learn backend in llm_sklearn.py.
+Trains a tiny model into a temporary directory:
+    python -m pytest test_llm_sklearn.py
+"""
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+import llm_mock
+import llm_sklearn
+
+TRAINING_ROWS = [
+    ('I love this product, it is great', 'positive'),
+    ('Excellent support and fast delivery', 'positive'),
+    ('Great value, very happy', 'positive'),
+    ('Terrible quality, it broke in a day', 'negative'),
+    ('Awful support, very slow and rude', 'negative'),
+    ('I hate it, a waste of money', 'negative'),
+    ('The package arrived on Tuesday', 'neutral'),
+    ('It is a phone with a screen', 'neutral'),
+    ('I ordered the blue one', 'neutral'),
+]
+TEXTS = ['Great product, I love it', 'Awful and slow', 'It arrived on Tuesday', '']
+
+
+@pytest.fixture(scope='module')
+def trained_model():
+    directory = tempfile.mkdtemp(prefix='sklearn-test-')
+    csv_path = os.path.join(directory, 'feedback.csv')
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write('text,sentiment\n')
+        f.writelines(f'"{text}",{sentiment}\n' for text, sentiment in TRAINING_ROWS * 3)
+    saved = llm_sklearn.MODEL_PATH
+    llm_sklearn.MODEL_PATH = os.path.join(directory, 'models', 'sentiment.joblib')
+    try:
+        llm_sklearn.train_model(csv_path)
+        yield llm_sklearn.reload_model()
+    finally:
+        llm_sklearn.MODEL_PATH = saved
+        llm_sklearn._model = llm_sklearn._model_version = None
+
+
+def test_model_is_loaded_memory_mapped(trained_model):
+    classifier = trained_model.named_steps['classifier']
+    assert list(trained_model.classes_) == ['negative', 'neutral', 'positive']
+    # Fitted arrays come back as read-only memory maps of the saved file
+    assert isinstance(classifier.coef_, np.memmap)
+    assert not classifier.coef_.flags.writeable
+    assert llm_sklearn.get_model() is trained_model
+    assert llm_sklearn.get_model_version()
+
+
+def test_results_have_the_shape_of_the_other_backends(trained_model):
+    batch = llm_sklearn.analyze_feedback_batch(TEXTS, generate_reply=False)
+    single = [llm_sklearn.analyze_feedback(text) for text in TEXTS]
+    assert batch == single
+    assert [result['feedback'] for result in batch] == TEXTS
+
+    common = {'feedback', 'sentiment', 'confidence'}
+    assert common <= set(llm_mock.analyze_feedback(TEXTS[0]))
+    for result in batch:
+        assert common <= set(result)
+        assert result['sentiment'] in ('positive', 'negative', 'neutral')
+        assert isinstance(result['confidence'], float) and 0.0 <= result['confidence'] <= 1.0
+        assert result['confidence'] == max(result['probabilities'].values())
+    assert [result['sentiment'] for result in batch[:3]] == ['positive', 'negative', 'neutral']
+    assert llm_sklearn.analyze_feedback_batch([]) == []
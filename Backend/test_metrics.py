@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the per-thread metric shards in metrics.py:
+    python -m pytest test_metrics.py
+"""
+import threading
+
+import metrics
+
+
+def run_in_thread(fn, *args, **kwargs):
+    thread = threading.Thread(target=fn, args=args, kwargs=kwargs)
+    thread.start()
+    thread.join()
+
+
+def test_finished_threads_are_retired_without_a_scrape():
+    for _ in range(200):
+        run_in_thread(metrics.increment, 'test_retired_total')
+        run_in_thread(metrics.observe, 'test_retired_seconds', 0.002, route='/x')
+    # Each new thread retires the ones that already exited
+    assert len(metrics._shards) <= 2
+    snapshot = metrics.snapshot()
+    assert snapshot.counters[('test_retired_total', ())] == 200
+    histogram = snapshot.histograms[('test_retired_seconds', (('route', '/x'),))]
+    assert sum(histogram[:-1]) == 200
+
+
+def test_live_threads_are_merged_at_scrape_time():
+    recorded, release = threading.Event(), threading.Event()
+
+    def worker():
+        metrics.increment('test_live_total', 3)
+        recorded.set()
+        release.wait()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    try:
+        recorded.wait()
+        assert metrics.snapshot().counters[('test_live_total', ())] == 3
+    finally:
+        release.set()
+        thread.join()
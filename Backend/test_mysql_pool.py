@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the MySQL connection pool in database.py.
+Uses a fake pymysql stand-in, so no MySQL server is needed:
+    python -m pytest test_mysql_pool.py
+"""
+import sys
+import threading
+import time
+import types
+
+try:
+    import pymysql
+except ImportError:
+    # Minimal stand-in for the parts of pymysql that database.py touches
+    pymysql = types.ModuleType('pymysql')
+    pymysql.err = types.SimpleNamespace(OperationalError=type('OperationalError', (Exception,), {}),
+                                        InterfaceError=type('InterfaceError', (Exception,), {}))
+    pymysql.cursors = types.SimpleNamespace(DictCursor=object)
+    pymysql.connect = lambda **kwargs: FakeConnection()
+    sys.modules['pymysql'] = pymysql
+
+from database import MySQLConnectionPool
+
+
+class FakeConnection:
+    """Records calls instead of talking to a server"""
+
+    def __init__(self):
+        self.closed = False
+        self.pings = 0
+        self.alive = True
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.alive:
+            raise pymysql.err.OperationalError('server has gone away')
+
+    def cursor(self):
+        return types.SimpleNamespace(execute=lambda *args: None)
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**options):
+    created = []
+
+    def connect():
+        connection = FakeConnection()
+        created.append(connection)
+        return connection
+
+    options.setdefault('min_size', 0)
+    return MySQLConnectionPool(connect=connect, **options), created
+
+
+def test_reuses_released_connections():
+    pool, created = make_pool(max_size=2)
+    for _ in range(5):
+        connection = pool.acquire()
+        connection.cursor().execute("SELECT 1")
+        connection.close()
+    assert len(created) == 1
+    assert pool.stats()['reused'] == 4
+
+
+def test_min_size_opens_connections_up_front():
+    pool, created = make_pool(min_size=3, max_size=5)
+    assert len(created) == 3
+    assert pool.stats()['idle'] == 3
+
+
+def test_checkout_times_out_when_exhausted():
+    pool, _ = make_pool(max_size=1, timeout=0.05)
+    held = pool.acquire()
+    try:
+        pool.acquire()
+        assert False, 'expected a checkout timeout'
+    except pymysql.err.OperationalError:
+        pass
+    held.close()
+    pool.acquire().close()
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_dead_idle_connection_is_replaced():
+    pool, created = make_pool(max_size=2, ping_interval=0)
+    connection = pool.acquire()
+    connection.close()
+    created[0].alive = False
+    time.sleep(0.01)
+    connection = pool.acquire()
+    assert len(created) == 2 and created[0].closed
+    assert pool.stats()['ping_failures'] == 1
+    connection.close()
+
+
+def test_connections_past_max_lifetime_are_closed():
+    pool, created = make_pool(max_size=2, max_lifetime=0.01)
+    connection = pool.acquire()
+    time.sleep(0.02)
+    connection.close()
+    assert created[0].closed
+    assert pool.stats()['expired'] == 1
+
+
+def test_idle_connections_are_reaped_down_to_min_size():
+    pool, created = make_pool(min_size=1, max_size=4, idle_timeout=0.01)
+    held = [pool.acquire() for _ in range(3)]
+    for connection in held[:2]:
+        connection.close()
+    time.sleep(0.02)
+    held[2].close()
+    stats = pool.stats()
+    assert stats['reaped'] == 2
+    assert stats['open'] == 1
+
+
+def test_concurrent_checkouts_never_exceed_max_size():
+    pool, created = make_pool(max_size=3)
+    in_use = []
+    peak = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(20):
+            connection = pool.acquire()
+            with lock:
+                in_use.append(connection)
+                peak.append(len(in_use))
+            time.sleep(0.001)
+            with lock:
+                in_use.remove(connection)
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) <= 3
+    assert len(created) <= 3
+    assert pool.stats()['checkouts'] == 160
+
+
+def test_open_connections_never_exceed_max_size_while_reaping():
+    pool, created = make_pool(min_size=1, max_size=4, idle_timeout=0.002)
+    peak_open = []
+    errors = []
+
+    def worker():
+        try:
+            for index in range(50):
+                connection = pool.acquire()
+                peak_open.append(pool.stats()['open'])
+                time.sleep(0.001 * (index % 3))
+                connection.close()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = pool.stats()
+    assert not errors, errors
+    assert max(peak_open) <= 4
+    # Every connection ever opened was either reaped or is still open
+    assert len(created) == stats['opened'] == stats['reaped'] + stats['open']
+    assert 1 <= stats['open'] <= 4 and stats['in_use'] == 0
+    assert sum(not connection.closed for connection in created) == stats['open']
+
+
+def test_reaping_does_not_hide_idle_connections_from_checkouts():
+    pool, created = make_pool(min_size=1, max_size=4, idle_timeout=0.05)
+    stale, fresh, held = pool.acquire(), pool.acquire(), pool.acquire()
+    stale.close()
+    time.sleep(0.06)
+    closing, finish = threading.Event(), threading.Event()
+
+    def slow_close():
+        closing.set()
+        finish.wait(1)
+
+    created[0].close = slow_close  # the connection `stale` checked out
+    releaser = threading.Thread(target=fresh.close)
+    releaser.start()
+    assert closing.wait(1)
+    # While the stale connection is being reaped, the fresh one stays checkoutable
+    connection = pool.acquire()
+    finish.set()
+    releaser.join()
+    assert len(created) == 3
+    assert pool.stats()['open'] == 2 and pool.stats()['reaped'] == 1
+    connection.close()
+    held.close()
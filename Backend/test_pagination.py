@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the keyset-paginated list endpoints in app.py and the
+authentication of per-user stats.
+Runs the Flask test client against a throwaway SQLite database:
+    python -m pytest test_pagination.py
+"""
+import os
+import tempfile
+
+import pytest
+
+import database_sqlite
+
+# Another test module may have imported database_sqlite first, so point the
+# module itself (not just the environment) at a throwaway database
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix='pagination-test-'), 'pagination.db')
+database_sqlite.DB_PATH = DB_PATH
+database_sqlite._pool = None
+
+import app as app_module
+from auth import issue_token
+
+app_module.SESSION_SWEEPER = False
+client = app_module.create_app(warm=False).test_client()
+
+
+@pytest.fixture(autouse=True)
+def pagination_database():
+    # Modules collected after this one re-point database_sqlite at their own file
+    saved = database_sqlite.DB_PATH, database_sqlite._pool
+    if saved[0] != DB_PATH:
+        database_sqlite.DB_PATH, database_sqlite._pool = DB_PATH, None
+    yield
+    if saved[0] != DB_PATH:
+        database_sqlite.DB_PATH, database_sqlite._pool = saved
+
+
+def make_user(email):
+    connection = database_sqlite.get_db_connection()
+    try:
+        user_id = connection.execute(
+            "INSERT INTO users (email, name, provider) VALUES (?, 'Pagination Test', 'local')", (email,)
+        ).lastrowid
+        connection.commit()
+    finally:
+        connection.close()
+    return user_id, {'Authorization': f'Bearer {issue_token(user_id, email)}'}
+
+
+def collect(path, headers, limit):
+    """Follow next_cursor to the end; returns the ids of every page"""
+    pages, after = [], None
+    while True:
+        query = {'limit': limit, **({'after': after} if after else {})}
+        response = client.get(path, query_string=query, headers=headers)
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        pages.append([item['id'] for item in body['items']])
+        after = body['next_cursor']
+        if not after:
+            return pages
+
+
+def test_analyses_follow_the_cursor_through_the_callers_rows_only():
+    user_id, headers = make_user('pages-owner@example.com')
+    other_id, _ = make_user('pages-other@example.com')
+    database_sqlite.save_analyses(
+        [(user_id, f'mine {index}', 'positive', 0.9, '2024-01-01 10:00:00', 'llm_mock') for index in range(7)]
+        + [(other_id, f'theirs {index}', 'negative', 0.9, '2024-01-01 10:00:00', 'llm_mock') for index in range(3)]
+    )
+    pages = collect('/api/analyses', headers, limit=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+
+    ids = [item_id for page in pages for item_id in page]
+    connection = database_sqlite.get_db_connection()
+    try:
+        expected = [row[0] for row in connection.execute(
+            "SELECT id FROM user_analyses WHERE user_id = ? ORDER BY created_at DESC, id DESC", (user_id,)
+        )]
+    finally:
+        connection.close()
+    # Equal created_at values are split across pages by id, with no repeats or gaps
+    assert ids == expected
+
+    response = client.get('/api/analyses', query_string={'user_id': other_id}, headers=headers)
+    assert response.status_code == 403
+
+
+def test_sessions_are_scoped_to_the_caller():
+    user_id, headers = make_user('pages-sessions@example.com')
+    items = client.get('/api/sessions', headers=headers).get_json()['items']
+    assert items and {item['user_id'] for item in items} == {user_id}
+
+
+def test_list_endpoints_require_a_token():
+    for path in ('/api/analyses', '/api/sessions', '/api/users'):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers={'Authorization': 'Bearer not-a-token'}).status_code == 401
+
+
+def test_users_are_listed_for_admins_only():
+    _, headers = make_user('pages-admin@example.com')
+    assert client.get('/api/users', headers=headers).status_code == 403
+
+    app_module.ADMIN_EMAILS.add('pages-admin@example.com')
+    try:
+        response = client.get('/api/users', query_string={'limit': 2}, headers=headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body['items']) == 2 and body['next_cursor']
+        response = client.get('/api/users', query_string={'after': 'garbage'}, headers=headers)
+        assert response.status_code == 400
+    finally:
+        app_module.ADMIN_EMAILS.discard('pages-admin@example.com')
+
+
+def test_per_user_stats_are_for_the_caller_only():
+    user_id, headers = make_user('stats-owner@example.com')
+    other_id, _ = make_user('stats-other@example.com')
+    database_sqlite.save_analyses([
+        (user_id, 'mine', 'positive', 0.9, '2024-03-01 10:00:00', 'llm_mock'),
+        (other_id, 'theirs', 'negative', 0.9, '2024-03-01 10:00:00', 'llm_mock'),
+    ])
+    query = {'granularity': 'day', 'from': '2024-03-01', 'to': '2024-03-02'}
+
+    # The global view stays public
+    response = client.get('/api/stats', query_string=query)
+    assert response.status_code == 200
+    assert response.get_json()['totals']['sentiments'] == {'positive': 1, 'negative': 1}
+
+    assert client.get('/api/stats', query_string={**query, 'user_id': user_id}).status_code == 401
+    response = client.get('/api/stats', query_string={**query, 'user_id': other_id}, headers=headers)
+    assert response.status_code == 403
+    response = client.get('/api/stats', query_string={**query, 'user_id': user_id}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['totals'] == {'analyses': 1, 'sentiments': {'positive': 1}}
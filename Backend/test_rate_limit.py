@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the token-bucket limiters in rate_limit.py:
+    python -m pytest test_rate_limit.py
+"""
+import os
+import tempfile
+import time
+
+from rate_limit import MemoryRateLimiter, SQLiteRateLimiter
+
+
+def test_burst_then_limited_with_retry_after():
+    limiter = MemoryRateLimiter('test', rate=2, burst=3)
+    assert [limiter.acquire('user:1') for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = limiter.acquire('user:1')
+    assert 0 < wait <= 0.5
+    # Other callers have their own bucket
+    assert limiter.acquire('ip:10.0.0.1') == 0.0
+
+
+def test_bucket_refills_over_time():
+    limiter = MemoryRateLimiter('test', rate=50, burst=1)
+    assert limiter.acquire('user:1') == 0.0
+    assert limiter.acquire('user:1') > 0
+    time.sleep(0.05)
+    assert limiter.acquire('user:1') == 0.0
+
+
+def test_cost_counts_against_the_bucket():
+    limiter = MemoryRateLimiter('batch', rate=10, burst=100)
+    assert limiter.acquire('user:1', cost=80) == 0.0
+    wait = limiter.acquire('user:1', cost=40)
+    assert 1.9 < wait <= 2.0  # 20 tokens short at 10 tokens/second
+    # A cost above the burst is capped so it can eventually succeed
+    assert MemoryRateLimiter('batch', rate=10, burst=5).acquire('user:2', cost=50) == 0.0
+
+
+def test_memory_is_bounded():
+    limiter = MemoryRateLimiter('test', rate=1, burst=10, max_keys=100)
+    for index in range(1000):
+        limiter.acquire(f'ip:{index}')
+    stats = limiter.stats()
+    assert stats['buckets'] == 100
+    assert stats['evicted'] == 900
+
+
+def test_idle_buckets_are_evicted():
+    limiter = MemoryRateLimiter('test', rate=100, burst=2)  # refills completely in 20 ms
+    for index in range(10):
+        limiter.acquire(f'ip:{index}')
+    time.sleep(0.05)
+    limiter.acquire('ip:new')
+    assert limiter.stats()['buckets'] == 1
+
+
+def test_sqlite_limits_are_shared_between_processes():
+    path = os.path.join(tempfile.mkdtemp(prefix='rate-limit-test-'), 'limits.db')
+    # Two limiter instances over one file behave like two worker processes
+    first = SQLiteRateLimiter('analyze', rate=1, burst=3, path=path)
+    second = SQLiteRateLimiter('analyze', rate=1, burst=3, path=path)
+    assert first.acquire('user:1') == 0.0
+    assert second.acquire('user:1') == 0.0
+    assert first.acquire('user:1') == 0.0
+    assert second.acquire('user:1') > 0
+    # Different limiters in the same file keep separate buckets
+    assert SQLiteRateLimiter('batch', rate=1, burst=3, path=path).acquire('user:1') == 0.0
+
+
+def test_sqlite_prunes_idle_buckets():
+    path = os.path.join(tempfile.mkdtemp(prefix='rate-limit-test-'), 'limits.db')
+    limiter = SQLiteRateLimiter('analyze', rate=100, burst=1, path=path)
+    for index in range(20):
+        limiter.acquire(f'ip:{index}')
+    time.sleep(0.05)
+    limiter.prune()
+    stats = limiter.stats()
+    assert stats['buckets'] == 0
+    assert stats['evicted'] == 20
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the session store in session_store.py.
+Runs against a throwaway SQLite database:
+    python -m pytest test_session_store.py
+"""
+import os
+import tempfile
+import time
+
+import database_sqlite
+import session_store
+from session_store import SessionStore, token_hash
+
+# Another test module may have imported database_sqlite first, so point the
+# module itself (not just the environment) at a throwaway database
+database_sqlite.DB_PATH = os.path.join(tempfile.mkdtemp(prefix='sessions-test-'), 'sessions.db')
+database_sqlite._pool = None
+database_sqlite.init_db()
+
+_user_counter = [0]
+
+
+def make_user():
+    _user_counter[0] += 1
+    connection = database_sqlite.get_db_connection()
+    try:
+        cursor = connection.execute(
+            "INSERT INTO users (email, name, provider) VALUES (?, 'Session Test', 'local')",
+            (f'session{_user_counter[0]}-{time.time()}@example.com',)
+        )
+        connection.commit()
+        return cursor.lastrowid
+    finally:
+        connection.close()
+
+
+def issue(store, user_id, lifetime=3600):
+    key = token_hash(f'token-{user_id}-{time.time()}-{os.urandom(4).hex()}')
+    store.record(user_id, key, time.time() + lifetime)
+    return key
+
+
+def test_revoke_one_session():
+    store = SessionStore()
+    user_id = make_user()
+    first, second = issue(store, user_id), issue(store, user_id)
+    store.revoke(user_id, first, time.time() + 3600)
+    assert store.is_revoked(first)
+    assert not store.is_revoked(second)
+
+
+def test_revoke_user_is_seen_by_other_processes():
+    store = SessionStore()
+    other = SessionStore()
+    other.sync()
+    user_id = make_user()
+    keys = [issue(store, user_id) for _ in range(3)]
+    assert store.revoke_user(user_id) == 3
+    assert all(store.is_revoked(key) for key in keys)
+    # Another process learns about it on its next sync, without per-request queries
+    assert not any(other.is_revoked(key) for key in keys)
+    other.sync()
+    assert all(other.is_revoked(key) for key in keys)
+    # A fresh process loads every unexpired revocation at startup
+    fresh = SessionStore()
+    fresh.sync()
+    assert all(fresh.is_revoked(key) for key in keys)
+
+
+def test_unrecorded_tokens_can_be_revoked():
+    store = SessionStore()
+    user_id = make_user()
+    key = token_hash('issued-before-sessions-were-recorded')
+    store.revoke(user_id, key, time.time() + 3600)
+    fresh = SessionStore()
+    fresh.sync()
+    assert fresh.is_revoked(key)
+
+
+def test_sweep_deletes_expired_sessions_in_batches():
+    store = SessionStore(sweep_batch=2)
+    user_id = make_user()
+    expired = [issue(store, user_id, lifetime=-60) for _ in range(5)]
+    live = issue(store, user_id)
+    assert store.sweep() >= 5
+    connection = database_sqlite.get_db_connection()
+    try:
+        remaining = {row['token_hash'] for row in connection.execute(
+            "SELECT token_hash FROM user_sessions WHERE user_id = ?", (user_id,)
+        )}
+    finally:
+        connection.close()
+    assert remaining == {live}
+    assert not set(expired) & remaining
+    assert store.stats()['sweeps'] == 1
+
+
+def test_sync_forgets_expired_revocations():
+    store = SessionStore()
+    user_id = make_user()
+    key = issue(store, user_id, lifetime=1)
+    store.revoke(user_id, key, time.time() + 1)
+    assert store.is_revoked(key)
+    time.sleep(1.1)
+    store.sync()
+    assert not store.is_revoked(key)
+
+
+def test_sync_sees_commits_that_land_out_of_order():
+    store = SessionStore()
+    other = SessionStore()
+    user_id = make_user()
+    other.sync()
+    first, late = issue(store, user_id), issue(store, user_id)
+    store.revoke(user_id, first, time.time() + 3600)
+    other.sync()
+    assert other.is_revoked(first)
+
+    # A worker whose clock lags (or that stamped revoked_at before waiting on
+    # the write lock) commits after the sync with an older revoked_at
+    real_time = time.time
+    session_store.time = type('LaggingClock', (), {'time': staticmethod(lambda: real_time() - 600)})
+    try:
+        store.revoke(user_id, late, real_time() + 3600)
+    finally:
+        session_store.time = time
+    connection = database_sqlite.get_db_connection()
+    try:
+        revoked_at = {row['token_hash']: row['revoked_at'] for row in connection.execute(
+            "SELECT token_hash, revoked_at FROM user_sessions WHERE user_id = ?", (user_id,)
+        )}
+    finally:
+        connection.close()
+    assert revoked_at[late] < revoked_at[first]
+    other.sync()
+    assert other.is_revoked(late)